@@ -0,0 +1,77 @@
+from django.http import HttpResponse
+from django.urls import URLPattern
+
+from asgiref.sync import sync_to_async
+
+READ_ACTIONS = ("list", "retrieve")
+
+
+async def in_thread(request, func, *args, **kwargs):
+    """Выполняет синхронную ``func`` в потоке и считает её запросы к базе."""
+    metrics = getattr(request, "metrics", None)
+
+    def run():
+        if metrics is None:
+            return func(*args, **kwargs)
+        with metrics.track():
+            return func(*args, **kwargs)
+
+    return await sync_to_async(run)()
+
+
+class AsyncReader:
+    """Асинхронный view для маршрута чтения viewset из роутера.
+
+    Под ASGI Django уходит в поток дважды на запрос к синхронному view:
+    чтобы вызвать его и чтобы отрендерить ответ DRF. Здесь запрос целиком
+    обслуживается одним переходом в поток: ``initial()`` с
+    аутентификацией, правами, лимитами и выбором формата, версии, ETag и
+    кэш ответов, выборка и рендеринг, а ошибки превращает в ответ сам
+    viewset. Асинхронного ORM в Django 3.2 нет, поэтому в цикле событий
+    не остаётся ничего, что может блокировать: ни базы, ни кэша.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def serve(self, request, args, kwargs):
+        response = self.callback(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        # Обычный HttpResponse с заголовками и cookies ответа DRF, чтобы
+        # Django не рендерил ответ ещё одним переходом в поток.
+        rendered = HttpResponse(
+            response.content,
+            status=response.status_code,
+            reason=response.reason_phrase,
+        )
+        for header, value in response.items():
+            rendered[header] = value
+        rendered.cookies = response.cookies
+        return rendered
+
+    def as_view(self):
+        async def view(request, *args, **kwargs):
+            return await in_thread(request, self.serve, request, args, kwargs)
+
+        view.cls = self.callback.cls
+        view.initkwargs = self.callback.initkwargs
+        view.actions = self.callback.actions
+        view.csrf_exempt = True
+        return view
+
+
+def with_async_reads(patterns, viewsets):
+    """Подменяет view маршрутов чтения ``viewsets`` на ``AsyncReader``."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            AsyncReader(pattern.callback).as_view(),
+            pattern.default_args,
+            pattern.name,
+        )
+        if getattr(pattern.callback, "cls", None) in viewsets
+        and pattern.callback.actions.get("get") in READ_ACTIONS
+        else pattern
+        for pattern in patterns
+    ]
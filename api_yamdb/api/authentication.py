@@ -0,0 +1,32 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache_user, get_cached_user, is_shared_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая держит пользователя в кэше.
+
+    Строка пользователя живёт в кэше ``API_USER_CACHE_TIMEOUT`` секунд и
+    сбрасывается сигналами при сохранении, удалении и ``update()``, так
+    что проверки ролей в permissions обходятся без запроса к базе.
+    Сигнал сбрасывает только кэш своего процесса, поэтому с LocMemCache
+    пользователь каждый раз читается из базы: иначе другие воркеры
+    пускали бы его со старой ролью.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+        if not is_shared_cache():
+            return super().get_user(validated_token)
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        return user
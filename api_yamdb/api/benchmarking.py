@@ -0,0 +1,88 @@
+import json
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def summarize(timings, queries):
+    """Сводит замеры маршрута: перцентили в мс, RPS и запросы к БД."""
+    if len(timings) > 1:
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = timings[0]
+    total = sum(timings)
+    return {
+        "requests": len(timings),
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "rps": round(len(timings) / total, 1) if total else 0.0,
+        "queries": round(sum(queries) / len(queries), 2),
+    }
+
+
+def measure(call, repeat, before=None):
+    """Вызывает ``call`` ``repeat`` раз и считает время и запросы к БД.
+
+    ``before`` выполняется перед каждым вызовом и в замер не входит.
+    """
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+        queries.append(len(captured.captured_queries))
+    return summarize(timings, queries)
+
+
+def format_table(results):
+    lines = [
+        f"{'route':<34}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'q/req':>7}"
+    ]
+    for name, row in results.items():
+        lines.append(
+            f"{name:<34}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+            f"{row['p99_ms']:>9.2f}{row['rps']:>9.0f}{row['queries']:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(results, baseline, tolerance):
+    """Возвращает список регрессий относительно сохранённого прогона.
+
+    Латентность сравнивается с допуском ``tolerance`` (доля от p95),
+    количество запросов к БД — строго.
+    """
+    regressions = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance)
+        if row["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {row['p95_ms']:.2f} мс > {limit:.2f} мс"
+            )
+        if row["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: запросов {row['queries']} > {base['queries']}"
+            )
+    return regressions
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def dump_json(data, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write("\n")
@@ -0,0 +1,210 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+from rest_framework import serializers
+
+from reviews.leaderboard import rebuild_ranking
+from reviews.models import Category, Genre, Title, TitleStats
+
+from .cache import bump_version
+from .serializers import SlugBulkSerializer, TitleBulkSerializer
+
+TITLE_FIELDS = ("name", "year", "description")
+
+
+def validate_items(serializer_class, items):
+    """Проверяет элементы пакета по отдельности.
+
+    Возвращает пары ``(индекс, данные)`` для корректных элементов и
+    список ошибок для остальных — ошибка одного элемента не прерывает
+    обработку пакета.
+    """
+    max_items = getattr(settings, "API_BULK_MAX_ITEMS", 1000)
+    if not isinstance(items, list):
+        raise serializers.ValidationError("Ожидается список объектов.")
+    if len(items) > max_items:
+        raise serializers.ValidationError(
+            f"В пакете не может быть больше {max_items} объектов."
+        )
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    return valid, errors
+
+
+def resolve_slugs(model, slugs):
+    """Отображение слаг → id для всех слагов пакета одним запросом."""
+    if not slugs:
+        return {}
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list("slug", "id")
+    )
+
+
+def insert_returning_pks(model, objects):
+    """bulk_create, после которого у объектов заполнены первичные ключи.
+
+    SQLite в Django 3.2 не возвращает ключи из bulk_create. Внутри
+    транзакции после первой вставки база заблокирована на запись, так
+    что последние ``len(objects)`` ключей принадлежат нашим строкам.
+    """
+    if not objects:
+        return
+    with transaction.atomic():
+        model.objects.bulk_create(objects)
+        if connection.features.can_return_rows_from_bulk_insert:
+            return
+        pks = list(
+            model.objects.order_by("-pk").values_list("pk", flat=True)[
+                : len(objects)
+            ]
+        )
+    for obj, pk in zip(objects, reversed(pks)):
+        obj.pk = pk
+
+
+class TitleBatch:
+    """Пакетная запись произведений.
+
+    Число запросов не зависит от размера пакета: по одному на категории,
+    жанры и обновляемые произведения, затем bulk_create, bulk_update и
+    вставка связей с жанрами через промежуточную таблицу.
+    """
+
+    def __init__(self, items):
+        self.valid, self.errors = validate_items(TitleBulkSerializer, items)
+        self.category_ids = resolve_slugs(
+            Category,
+            {data["category"] for _, data in self.valid if "category" in data},
+        )
+        self.genre_ids = resolve_slugs(
+            Genre,
+            {slug for _, data in self.valid for slug in data.get("genre", ())},
+        )
+        self.existing = Title.objects.in_bulk(
+            [data["id"] for _, data in self.valid if "id" in data]
+        )
+        self.seen_ids = set()
+        self.to_create, self.to_update, self.genres = [], [], []
+
+    def check(self, data):
+        errors = {}
+        if "id" in data:
+            if data["id"] not in self.existing:
+                errors["id"] = [f"Произведение {data['id']} не найдено."]
+            elif data["id"] in self.seen_ids:
+                errors["id"] = ["Произведение повторяется в пакете."]
+            self.seen_ids.add(data["id"])
+        if "category" in data and data["category"] not in self.category_ids:
+            errors["category"] = [
+                f"Категория {data['category']} не найдена."
+            ]
+        unknown = [
+            slug
+            for slug in data.get("genre", ())
+            if slug not in self.genre_ids
+        ]
+        if unknown:
+            errors["genre"] = [f"Жанр {slug} не найден." for slug in unknown]
+        return errors
+
+    def add(self, data):
+        title = self.existing[data["id"]] if "id" in data else Title()
+        for field in TITLE_FIELDS:
+            if field in data:
+                setattr(title, field, data[field])
+        if "category" in data:
+            title.category_id = self.category_ids[data["category"]]
+        (self.to_update if "id" in data else self.to_create).append(title)
+        if "genre" in data:
+            genre_ids = {self.genre_ids[slug]: None for slug in data["genre"]}
+            self.genres.append((title, genre_ids))
+
+    def save(self):
+        through = Title.genre.through
+        with transaction.atomic():
+            insert_returning_pks(Title, self.to_create)
+            # Сигнал post_save, создающий строку статистики, bulk_create
+            # не шлёт.
+            TitleStats.objects.bulk_create(
+                TitleStats(title_id=title.pk) for title in self.to_create
+            )
+            if self.to_update:
+                Title.objects.bulk_update(
+                    self.to_update, TITLE_FIELDS + ("category",)
+                )
+            updated_ids = {title.pk for title in self.to_update}
+            replaced = [
+                title.pk for title, _ in self.genres if title.pk in updated_ids
+            ]
+            if replaced:
+                through.objects.filter(title_id__in=replaced).delete()
+            through.objects.bulk_create(
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, genre_ids in self.genres
+                for genre_id in genre_ids
+            )
+        saved = self.to_create + self.to_update
+        if saved:
+            # bulk_create и bulk_update не шлют сигналов, поэтому строки
+            # рейтинга собираются здесь.
+            rebuild_ranking(
+                Title.objects.filter(pk__in=[title.pk for title in saved])
+            )
+            bump_version(Title)
+
+    def run(self):
+        for index, data in self.valid:
+            errors = self.check(data)
+            if errors:
+                self.errors.append({"index": index, "errors": errors})
+            else:
+                self.add(data)
+        self.save()
+        self.errors.sort(key=lambda error: error["index"])
+        return {
+            "created": [title.pk for title in self.to_create],
+            "updated": [title.pk for title in self.to_update],
+            "errors": self.errors,
+        }
+
+
+def write_titles(items):
+    return TitleBatch(items).run()
+
+
+def write_slugged(model, items):
+    """Создаёт категории или жанры пакетом.
+
+    Занятые слаги проверяются одним запросом для всего пакета.
+    """
+    valid, errors = validate_items(SlugBulkSerializer, items)
+    taken = set(
+        model.objects.filter(
+            slug__in=[data["slug"] for _, data in valid]
+        ).values_list("slug", flat=True)
+    )
+    to_create = []
+    for index, data in valid:
+        if data["slug"] in taken:
+            errors.append(
+                {
+                    "index": index,
+                    "errors": {"slug": [f"Слаг {data['slug']} уже занят."]},
+                }
+            )
+            continue
+        taken.add(data["slug"])
+        to_create.append(model(**data))
+    if to_create:
+        model.objects.bulk_create(to_create)
+        bump_version(model)
+    errors.sort(key=lambda error: error["index"])
+    return {
+        "created": [obj.slug for obj in to_create],
+        "errors": errors,
+    }
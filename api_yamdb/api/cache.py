@@ -0,0 +1,111 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+HITS_KEY = "api:cache:hits"
+MISSES_KEY = "api:cache:misses"
+
+
+def version_key(model):
+    return f"api:version:{model._meta.label_lower}"
+
+
+def get_versions(models):
+    """Возвращает текущие версии данных моделей одним обращением к кэшу."""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    # Стартуем со времени, чтобы после вытеснения ключа версия не
+    # совпала со старой и не оживила устаревшие ответы.
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, get_version_timeout())
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """Делает недействительными все ответы, зависящие от модели.
+
+    Версией служит время последнего изменения в наносекундах, поэтому
+    по ней же строится заголовок Last-Modified.
+    """
+    cache.set(version_key(model), time.time_ns(), get_version_timeout())
+
+
+def increment(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats():
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        "hits": stats.get(HITS_KEY, 0),
+        "misses": stats.get(MISSES_KEY, 0),
+    }
+
+
+def get_response_key(request, basename, versions, format=None):
+    if format is None:
+        format = request.accepted_renderer.format
+    versions = ".".join(str(version) for version in versions)
+    raw = "|".join((request.build_absolute_uri(), format))
+    digest = md5(raw.encode()).hexdigest()
+    return f"api:response:{basename}:{versions}:{digest}"
+
+
+def get_etag(key):
+    return f'"{md5(key.encode()).hexdigest()}"'
+
+
+def get_last_modified(versions):
+    """Время изменения самой свежей из моделей, в секундах."""
+    if not versions:
+        return None
+    return max(versions) // 10**9
+
+
+def get_timeout():
+    return getattr(settings, "API_CACHE_TIMEOUT", 300)
+
+
+def is_shared_cache():
+    """Общий ли кэш ``default`` для всех процессов приложения."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def get_version_timeout():
+    """Время жизни версий данных в кэше.
+
+    В общем кэше версии хранятся бессрочно. В кэше процесса версия
+    живёт не дольше ответов: воркер, не видевший записи, иначе вечно
+    отвечал бы 304 на старый ``If-None-Match``.
+    """
+    return None if is_shared_cache() else get_timeout()
+
+
+def user_key(user_id):
+    return f"api:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    return cache.get(user_key(user_id))
+
+
+def cache_user(user):
+    cache.set(
+        user_key(user.pk),
+        user,
+        getattr(settings, "API_USER_CACHE_TIMEOUT", 60),
+    )
+
+
+def forget_users(user_ids):
+    cache.delete_many([user_key(user_id) for user_id in user_ids])
@@ -0,0 +1,106 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Вне HTTP-запросов (команды, воркеры, миграции) всё идёт в основную
+# базу; на реплики переключает только ReplicaRoutingMiddleware.
+use_primary = ContextVar("use_primary", default=True)
+
+_health = {}
+
+
+@contextmanager
+def primary_reads():
+    """Внутри блока чтение идёт в основную базу."""
+    token = use_primary.set(True)
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+def is_recent(version):
+    """Свежая ли версия данных (``time_ns``).
+
+    Версия моложе ``DATABASE_REPLICA_PIN_SECONDS``: выставившая её запись
+    могла ещё не дойти до реплик.
+    """
+    pin = getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5)
+    return time.time_ns() - version < pin * 10**9
+
+
+def get_replicas():
+    return getattr(settings, "DATABASE_REPLICAS", ())
+
+
+def replica_is_healthy(alias):
+    """Проверяет реплику не чаще раза в ``DATABASE_REPLICA_CHECK_INTERVAL``.
+
+    Реплика считается рабочей, если отвечает и в ней есть схема.
+    """
+    interval = getattr(settings, "DATABASE_REPLICA_CHECK_INTERVAL", 5)
+    healthy, checked_at = _health.get(alias, (None, 0.0))
+    now = time.monotonic()
+    if healthy is not None and now - checked_at < interval:
+        return healthy
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM django_migrations LIMIT 1")
+        healthy = True
+    except DatabaseError:
+        connections[alias].close()
+        healthy = False
+    _health[alias] = (healthy, now)
+    return healthy
+
+
+def pin_key(client_id):
+    digest = md5(client_id.encode()).hexdigest()
+    return f"api:db:pin:{digest}"
+
+
+def pin_to_primary(client_id):
+    """Читать из основной базы, пока реплики не догнали запись клиента."""
+    cache.set(
+        pin_key(client_id),
+        True,
+        getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5),
+    )
+
+
+def is_pinned(client_id):
+    return bool(cache.get(pin_key(client_id)))
+
+
+class ReplicaRouter:
+    """Чтение с реплик ``DATABASE_REPLICAS``, запись — в основную базу.
+
+    Реплика выбирается случайно среди здоровых; если здоровых нет,
+    чтение тоже идёт в основную базу. Внутри транзакции основной базы
+    чтение остаётся в ней, чтобы видеть собственные изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        healthy = [
+            alias for alias in get_replicas() if replica_is_healthy(alias)
+        ]
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return random.choice(healthy)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS or db not in get_replicas()
@@ -1,13 +1,87 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db.models import Q
 
-from reviews.models import Title
+from django_filters.rest_framework import BaseInFilter, CharFilter, FilterSet
+from rest_framework.filters import BaseFilterBackend
+
+from reviews.models import Category, Title
+from reviews.search import get_search_backend
+
+PREFIX_LOOKUP = "startswith"
+
+
+def slug_condition(field, slugs, prefix=False):
+    """Условие на слаги, которое база проверяет по индексу ``slug``.
+
+    Точные слаги сравниваются через ``IN``. Префикс — через диапазон
+    ``slug >= p AND slug < p'``, а не LIKE: SQLite не ведёт
+    регистронезависимый LIKE по индексу.
+    """
+    if not prefix:
+        return Q(**{f"{field}__in": slugs})
+    condition = Q()
+    for slug in slugs:
+        condition |= Q(
+            **{
+                f"{field}__gte": slug,
+                f"{field}__lt": slug[:-1] + chr(ord(slug[-1]) + 1),
+            }
+        )
+    return condition
+
+
+class SlugsFilter(BaseInFilter, CharFilter):
+    """Один или несколько слагов через запятую."""
 
 
 class TitlesFilter(FilterSet):
-    name = CharFilter(field_name="name", lookup_expr="contains")
-    category = CharFilter(field_name="category__slug", lookup_expr="contains")
-    genre = CharFilter(field_name="genre__slug", lookup_expr="contains")
+    name = CharFilter(method="filter_name")
+    category = SlugsFilter(method="filter_category")
+    category__startswith = SlugsFilter(method="filter_category")
+    genre = SlugsFilter(method="filter_genre")
+    genre__startswith = SlugsFilter(method="filter_genre")
 
     class Meta:
         model = Title
-        fields = ("name", "category", "genre", "year")
+        fields = {"year": ("exact", "gte", "lte")}
+
+    def filter_name(self, queryset, name, value):
+        return get_search_backend().search(queryset, value, fields=(name,))
+
+    @staticmethod
+    def get_slugs(name, value):
+        return (
+            [slug for slug in value if slug],
+            name.endswith(f"__{PREFIX_LOOKUP}"),
+        )
+
+    def filter_category(self, queryset, name, value):
+        slugs, prefix = self.get_slugs(name, value)
+        if not slugs:
+            return queryset
+        categories = Category.objects.filter(
+            slug_condition("slug", slugs, prefix)
+        )
+        return queryset.filter(category__in=categories.values("pk"))
+
+    def filter_genre(self, queryset, name, value):
+        # Подзапрос по связующей таблице вместо JOIN: произведение с
+        # несколькими подходящими жанрами не повторяется в выдаче.
+        slugs, prefix = self.get_slugs(name, value)
+        if not slugs:
+            return queryset
+        links = Title.genre.through.objects.filter(
+            slug_condition("genre__slug", slugs, prefix)
+        )
+        return queryset.filter(pk__in=links.values("title_id"))
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по ``?q=`` с сортировкой по релевантности."""
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param)
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
@@ -0,0 +1,294 @@
+import asyncio
+import http.client
+import logging
+import multiprocessing
+import statistics
+import threading
+import time
+from functools import partial
+from http import HTTPStatus
+from socketserver import ThreadingMixIn
+from types import ModuleType
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from api.urls import get_api_urls
+from reviews.models import Review
+from reviews.seeding import seed_catalog
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class WSGIBenchServer:
+    """Многопоточный WSGI-сервер из стандартной библиотеки."""
+
+    def __init__(self):
+        self.server = make_server(
+            "127.0.0.1",
+            0,
+            get_wsgi_application(),
+            server_class=ThreadingWSGIServer,
+            handler_class=QuietWSGIRequestHandler,
+        )
+        self.port = self.server.server_port
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ASGIBenchServer:
+    """Минимальный HTTP-сервер для ASGI на asyncio.
+
+    Только то, что нужно бенчмарку: GET без тела и соединение на
+    запрос, как у WSGI-сервера выше.
+    """
+
+    def __init__(self):
+        self.application = get_asgi_application()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.create_server())
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def create_server(self):
+        return await asyncio.start_server(
+            self.handle, "127.0.0.1", 0, backlog=1024
+        )
+
+    def start(self):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def stop(self):
+        async def close():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def get_scope(self, head, writer):
+        request_line, *lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+        raw_path, _, query = target.partition("?")
+        headers = []
+        for line in filter(None, lines):
+            name, _, value = line.partition(":")
+            headers.append(
+                (name.strip().lower().encode(), value.strip().encode())
+            )
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(raw_path),
+            "raw_path": raw_path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": writer.get_extra_info("peername")[:2],
+            "server": ("127.0.0.1", self.port),
+        }
+
+    @staticmethod
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    @staticmethod
+    async def send(writer, message):
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}".encode()]
+            lines.extend(
+                name + b": " + value for name, value in message["headers"]
+            )
+            lines.append(b"Connection: close")
+            writer.write(b"\r\n".join(lines) + b"\r\n\r\n")
+        elif message["type"] == "http.response.body":
+            writer.write(message.get("body", b""))
+            await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            await self.application(
+                self.get_scope(head, writer),
+                self.receive,
+                partial(self.send, writer),
+            )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def client(port, urls, deadline, results):
+    latencies = []
+    errors = 0
+    index = 0
+    while time.perf_counter() < deadline:
+        url = urls[index % len(urls)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            conn.request("GET", url)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+        except OSError:
+            errors += 1
+            continue
+        if response.status != 200:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.append((latencies, errors))
+
+
+def load(port, urls, clients, seconds):
+    """Гоняет ``clients`` параллельных клиентов ``seconds`` секунд.
+
+    Запускается в отдельном процессе, чтобы клиенты не делили GIL с
+    сервером.
+    """
+    deadline = time.perf_counter() + seconds
+    results = []
+    threads = [
+        threading.Thread(
+            target=client, args=(port, urls[i:] + urls[:i], deadline, results)
+        )
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies = [value for values, _ in results for value in values]
+    return latencies, sum(errors for _, errors in results)
+
+
+def api_urlconf(async_reads):
+    """ROOT_URLCONF с асинхронными обработчиками чтения или без них."""
+    urlconf = ModuleType("bench_urls")
+    urlconf.urlpatterns = [
+        path("api/v1/", include(get_api_urls(async_reads)))
+    ]
+    return urlconf
+
+
+class Command(BaseCommand):
+    help = (
+        "Поднимает локальные WSGI- и ASGI-серверы и сравнивает пропускную "
+        "способность чтения каталога при параллельных клиентах: WSGI и "
+        "ASGI с синхронными view и ASGI с асинхронными обработчиками"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=200)
+        parser.add_argument("--clients", type=int, default=16)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="не кэшировать ответы: каждый запрос идёт в базу",
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=False
+        )
+        try:
+            title_ids = seed_catalog(
+                users=50, titles=options["titles"], reviews_per_title=10
+            )
+            urls = self.get_urls(title_ids)
+            timeout = 0 if options["cold_cache"] else 300
+            # Журнал запросов на каждый ответ исказил бы замер.
+            logging.disable(logging.WARNING)
+            with override_settings(API_CACHE_TIMEOUT=timeout):
+                self.run(urls, options)
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    @staticmethod
+    def get_urls(title_ids):
+        title_id = title_ids[len(title_ids) // 2]
+        review = Review.objects.filter(title_id=title_id).first()
+        reviews_url = f"/api/v1/titles/{title_id}/reviews/"
+        return [
+            "/api/v1/titles/",
+            "/api/v1/titles/?page=2",
+            f"/api/v1/titles/{title_id}/",
+            "/api/v1/genres/",
+            "/api/v1/categories/",
+            reviews_url,
+            f"{reviews_url}{review.id}/",
+        ]
+
+    def run(self, urls, options):
+        profiles = {
+            "wsgi": (WSGIBenchServer, api_urlconf(False)),
+            "asgi": (ASGIBenchServer, api_urlconf(False)),
+            "asgi-async": (ASGIBenchServer, api_urlconf(True)),
+        }
+        self.stdout.write(
+            f"{'server':<12}{'requests':>10}{'errors':>8}{'rps':>10}"
+            f"{'p50':>9}{'p95':>9}"
+        )
+        context = multiprocessing.get_context("fork")
+        for name, (server_class, urlconf) in profiles.items():
+            cache.clear()
+            with override_settings(ROOT_URLCONF=urlconf):
+                server = server_class()
+                server.start()
+                try:
+                    with context.Pool(1) as pool:
+                        latencies, errors = pool.apply(
+                            load,
+                            (
+                                server.port,
+                                urls,
+                                options["clients"],
+                                options["seconds"],
+                            ),
+                        )
+                finally:
+                    server.stop()
+            self.stdout.write(
+                self.format_row(name, latencies, errors, options)
+            )
+
+    @staticmethod
+    def format_row(name, latencies, errors, options):
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95 = cuts[49] * 1000, cuts[94] * 1000
+        else:
+            p50 = p95 = 0.0
+        return (
+            f"{name:<12}{len(latencies):>10}{errors:>8}"
+            f"{len(latencies) / options['seconds']:>10.0f}"
+            f"{p50:>9.2f}{p95:>9.2f}"
+        )
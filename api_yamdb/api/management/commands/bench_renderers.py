@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarking import format_table, measure
+from api.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+from api.serializers import (
+    FlatReviewSerializer,
+    FlatTitleSerializer,
+    ReviewsSerializer,
+    TitleSerializerGet
+)
+from reviews.models import Review, Title
+from reviews.seeding import seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время сериализации страниц произведений и отзывов "
+        "обычными и плоскими сериализаторами и их рендеринга через "
+        "JSONRenderer, orjson и MessagePack"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=False
+        )
+        try:
+            results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(format_table(results))
+
+    def run(self, options):
+        page_size = options["page_size"]
+        title_ids = seed_catalog(
+            users=page_size,
+            titles=page_size,
+            reviews_per_title=page_size,
+            comments_per_review=0,
+        )
+        titles = (
+            Title.objects.select_related("category")
+            .prefetch_related("genre")
+            .order_by("name")[:page_size]
+        )
+        reviews = (
+            Review.objects.filter(title_id=title_ids[0])
+            .select_related("author")
+            .order_by("-pub_date")[:page_size]
+        )
+        pages = {
+            "titles": (titles, TitleSerializerGet, FlatTitleSerializer),
+            "reviews": (reviews, ReviewsSerializer, FlatReviewSerializer),
+        }
+        renderers = {
+            "json": JSONRenderer(),
+            "orjson": FastJSONRenderer(),
+        }
+        if msgpack is not None:
+            renderers["msgpack"] = MessagePackRenderer()
+
+        results = {}
+        for page, (queryset, serializer_class, flat_class) in pages.items():
+            # Замеры включают выборку страницы: плоский сериализатор
+            # выигрывает в том числе на отказе от экземпляров моделей.
+            results[f"{page} serialize"] = measure(
+                lambda: serializer_class(queryset.all(), many=True).data,
+                options["repeat"],
+            )
+            results[f"{page} serialize flat"] = measure(
+                lambda: flat_class(
+                    flat_class.get_rows(queryset.all()), many=True
+                ).data,
+                options["repeat"],
+            )
+            data = serializer_class(queryset.all(), many=True).data
+            for name, renderer in renderers.items():
+                results[f"{page} render {name}"] = measure(
+                    lambda: renderer.render(data), options["repeat"]
+                )
+        return results
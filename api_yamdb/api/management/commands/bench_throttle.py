@@ -0,0 +1,88 @@
+from itertools import count
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarking import format_table, measure
+from api.throttling import IPThrottle, UsernameThrottle
+from api.views import UserCreateView
+
+STORES = {
+    "lru": "api.throttling.LRUBucketStore",
+    "cache": "api.throttling.CacheBucketStore",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет, сколько стоит проверка лимитов регистрации на запрос "
+        "с хранилищами счётчиков в памяти процесса и в кэше Django, и "
+        "время отказа по лимиту целиком через view"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=False
+        )
+        try:
+            results = self.run(options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(format_table(results))
+
+    def run(self, repeat):
+        factory = APIRequestFactory()
+        view = UserCreateView.as_view()
+        throttles = (IPThrottle(), UsernameThrottle())
+        numbers = count()
+        requests = []
+
+        def signup(username, address):
+            return factory.post(
+                "/api/v1/auth/signup/",
+                {"username": username, "email": "bot@yamdb.fake"},
+                REMOTE_ADDR=address,
+            )
+
+        def check(request):
+            drf_request = UserCreateView().initialize_request(request)
+            for throttle in throttles:
+                throttle.allow_request(drf_request, UserCreateView)
+
+        def new_client():
+            # Новые адрес и имя: корзины создаются и записываются, как при
+            # первом запросе клиента.
+            number = next(numbers)
+            requests[:] = [
+                signup(
+                    f"user{number}",
+                    f"10.{number >> 16 & 255}.{number >> 8 & 255}."
+                    f"{number & 255}",
+                )
+            ]
+
+        bot = signup("bot", "10.255.255.255")
+        rates = {"signup_ip": "1000000/s", "signup_username": "1/d"}
+        results = {}
+        for name, path in STORES.items():
+            with override_settings(
+                API_THROTTLE_STORE=path, API_THROTTLE_RATES=rates
+            ):
+                results[f"{name} new client"] = measure(
+                    lambda: check(requests[0]), repeat, before=new_client
+                )
+                # Бот уже исчерпал лимит на имя: дальше только отказы.
+                check(bot)
+                results[f"{name} rejected"] = measure(
+                    lambda: check(bot), repeat
+                )
+                results[f"{name} rejected view"] = measure(
+                    lambda: view(bot), repeat
+                )
+        return results
@@ -0,0 +1,370 @@
+import logging
+from itertools import count
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmarking import (
+    compare,
+    dump_json,
+    format_table,
+    load_json,
+    measure
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.seeding import seed_catalog
+from users.models import User
+
+TITLES_URL = "/api/v1/titles/"
+
+
+def review_url(title, review):
+    return f"{TITLES_URL}{title.pk}/reviews/{review.id}/"
+
+
+def request(client, method, url, data=None, expected=200, setup=None):
+    """Вызов маршрута; ``setup`` готовит данные вне замера."""
+
+    def call():
+        payload = data() if callable(data) else data
+        target = url() if callable(url) else url
+        response = getattr(client, method)(
+            target, data=payload, format="json"
+        )
+        if response.status_code != expected:
+            raise CommandError(
+                f"{method.upper()} {target}: ответ "
+                f"{response.status_code}, ожидался {expected}"
+            )
+
+    call.setup = setup
+    return call
+
+
+class Command(BaseCommand):
+    help = (
+        "Наполняет временную базу синтетическими данными, прогоняет все "
+        "маршруты API через тестовый клиент и сравнивает результат с "
+        "сохранённым прогоном"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--titles", type=int, default=500)
+        parser.add_argument("--genres", type=int, default=20)
+        parser.add_argument("--reviews-per-title", type=int, default=20)
+        parser.add_argument("--comments-per-review", type=int, default=2)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="запросов на маршрут"
+        )
+        parser.add_argument(
+            "--route", action="append", help="прогнать только эти маршруты"
+        )
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="очищать кэш ответов перед каждым запросом",
+        )
+        parser.add_argument("--output", help="сохранить результат в JSON")
+        parser.add_argument("--baseline", help="JSON прошлого прогона")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="допустимый рост p95 относительно baseline",
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=False
+        )
+        # Журнал запросов на каждый ответ исказил бы замер и залил вывод.
+        logging.disable(logging.WARNING)
+        try:
+            # Лимиты регистрации и токенов отклонили бы повторные запросы
+            # маршрута с одного адреса.
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+                API_THROTTLE_RATES={},
+            ):
+                results = self.run(options)
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(format_table(results))
+        if options["output"]:
+            dump_json(results, options["output"])
+        if options["baseline"]:
+            regressions = compare(
+                results, load_json(options["baseline"]), options["tolerance"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Регрессия производительности:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("Регрессий нет"))
+
+    def run(self, options):
+        cache.clear()
+        title_ids = seed_catalog(
+            users=options["users"],
+            titles=options["titles"],
+            genres=options["genres"],
+            reviews_per_title=options["reviews_per_title"],
+            comments_per_review=options["comments_per_review"],
+        )
+        routes = self.get_routes(title_ids)
+        if options["route"]:
+            routes = {
+                name: route
+                for name, route in routes.items()
+                if name in options["route"]
+            }
+        results = {}
+        for name, call in routes.items():
+            setup = getattr(call, "setup", None)
+
+            def before(setup=setup):
+                if options["cold_cache"]:
+                    cache.clear()
+                if setup is not None:
+                    setup()
+
+            before()
+            call()
+            results[name] = measure(call, options["requests"], before)
+        return results
+
+    def get_routes(self, title_ids):
+        self.sequence = count()
+        self.doomed = []
+        self.review_titles = iter(title_ids)
+        clients = self.get_clients()
+        title = Title.objects.get(pk=title_ids[len(title_ids) // 2])
+        review = Review.objects.filter(title=title).first()
+        routes = self.get_user_routes(clients)
+        routes.update(self.get_catalog_routes(clients))
+        routes.update(self.get_title_routes(clients, title))
+        routes.update(self.get_review_routes(clients, title, review))
+        routes.update(self.get_auth_routes(clients))
+        comment = Comment.objects.filter(review=review).first()
+        if comment:
+            routes["GET /comments/{id}/"] = request(
+                clients["anon"],
+                "get",
+                f"{review_url(title, review)}comments/{comment.id}/",
+            )
+        return routes
+
+    def get_clients(self):
+        admin = User.objects.create_user(
+            username="bench_admin",
+            email="bench_admin@yamdb.fake",
+            role="admin",
+        )
+        self.user = User.objects.create_user(
+            username="bench_user", email="bench_user@yamdb.fake"
+        )
+        self.confirmation_code = (
+            self.user.generate_confirmation_code_no_email()
+        )
+        clients = {"anon": APIClient()}
+        for name, user in (("admin", admin), ("user", self.user)):
+            clients[name] = APIClient()
+            clients[name].credentials(
+                HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+            )
+        return clients
+
+    def slugs(self, prefix, size=1):
+        return [
+            {"name": "Пакет", "slug": f"{prefix}-{next(self.sequence)}"}
+            for _ in range(size)
+        ]
+
+    def create_doomed(self, model):
+        """Готовит вне замера объект для маршрута удаления."""
+
+        def setup():
+            self.doomed.append(
+                model.objects.create(
+                    name="Удаляемый", slug=f"doomed-{next(self.sequence)}"
+                ).slug
+            )
+
+        return setup
+
+    def doomed_url(self, prefix):
+        return lambda: f"/api/v1/{prefix}/{self.doomed.pop()}/"
+
+    def next_reviews_url(self):
+        title_id = next(self.review_titles, None)
+        if title_id is None:
+            raise CommandError(
+                "Для POST /reviews/ нужно больше произведений, "
+                "чем запросов: увеличьте --titles"
+            )
+        return f"{TITLES_URL}{title_id}/reviews/"
+
+    def get_user_routes(self, clients):
+        admin_client = clients["admin"]
+        return {
+            "GET /users/": request(admin_client, "get", "/api/v1/users/"),
+            "GET /users/{username}/": request(
+                admin_client, "get", f"/api/v1/users/{self.user.username}/"
+            ),
+            "GET /users/me/": request(
+                clients["user"], "get", "/api/v1/users/me/"
+            ),
+        }
+
+    def get_catalog_routes(self, clients):
+        admin_client, anon = clients["admin"], clients["anon"]
+        return {
+            "POST /categories/": request(
+                admin_client,
+                "post",
+                "/api/v1/categories/",
+                lambda: {
+                    "name": "Новая",
+                    "slug": f"bench-{next(self.sequence)}",
+                },
+                expected=201,
+            ),
+            "GET /categories/": request(anon, "get", "/api/v1/categories/"),
+            "DELETE /categories/{slug}/": request(
+                admin_client,
+                "delete",
+                self.doomed_url("categories"),
+                expected=204,
+                setup=self.create_doomed(Category),
+            ),
+            "POST /categories/bulk/": request(
+                admin_client,
+                "post",
+                "/api/v1/categories/bulk/",
+                lambda: self.slugs("bench-category", 10),
+            ),
+            "POST /genres/": request(
+                admin_client,
+                "post",
+                "/api/v1/genres/",
+                lambda: self.slugs("bench-genre")[0],
+                expected=201,
+            ),
+            "GET /genres/": request(anon, "get", "/api/v1/genres/"),
+            "DELETE /genres/{slug}/": request(
+                admin_client,
+                "delete",
+                self.doomed_url("genres"),
+                expected=204,
+                setup=self.create_doomed(Genre),
+            ),
+            "POST /genres/bulk/": request(
+                admin_client,
+                "post",
+                "/api/v1/genres/bulk/",
+                lambda: self.slugs("bench-genre", 10),
+            ),
+        }
+
+    def get_title_routes(self, clients, title):
+        admin_client, anon = clients["admin"], clients["anon"]
+        genre = Genre.objects.first()
+        category = Category.objects.first()
+        title_url = f"{TITLES_URL}{title.pk}/"
+        return {
+            "GET /titles/": request(anon, "get", TITLES_URL),
+            "GET /titles/?genre=": request(
+                anon, "get", f"{TITLES_URL}?genre={genre.slug}"
+            ),
+            "GET /titles/?q=": request(
+                anon, "get", f"{TITLES_URL}?q={title.name.split()[-1]}"
+            ),
+            "GET /titles/{id}/": request(anon, "get", title_url),
+            "PATCH /titles/{id}/": request(
+                admin_client, "patch", title_url, {"year": title.year}
+            ),
+            "GET /titles/{id}/stats/": request(
+                anon, "get", f"{title_url}stats/"
+            ),
+            "GET /titles/top/": request(anon, "get", f"{TITLES_URL}top/"),
+            "POST /titles/bulk/": request(
+                admin_client,
+                "post",
+                f"{TITLES_URL}bulk/",
+                [
+                    {
+                        "name": f"Пакетное {index}",
+                        "year": 2000,
+                        "category": category.slug,
+                        "genre": [genre.slug],
+                    }
+                    for index in range(10)
+                ],
+            ),
+        }
+
+    def get_review_routes(self, clients, title, review):
+        admin_client, anon = clients["admin"], clients["anon"]
+        reviews_url = f"{TITLES_URL}{title.pk}/reviews/"
+        comments_url = f"{review_url(title, review)}comments/"
+        return {
+            "GET /reviews/": request(anon, "get", reviews_url),
+            "GET /reviews/?cursor=": request(
+                anon, "get", f"{reviews_url}?cursor="
+            ),
+            "POST /reviews/": request(
+                admin_client,
+                "post",
+                self.next_reviews_url,
+                {"text": "Отзыв из бенчмарка", "score": 7},
+                expected=201,
+            ),
+            "GET /reviews/{id}/": request(
+                anon, "get", review_url(title, review)
+            ),
+            "PATCH /reviews/{id}/": request(
+                admin_client,
+                "patch",
+                review_url(title, review),
+                {"score": review.score},
+            ),
+            "GET /comments/": request(anon, "get", comments_url),
+            "POST /comments/": request(
+                clients["user"],
+                "post",
+                comments_url,
+                {"text": "Комментарий из бенчмарка"},
+                expected=201,
+            ),
+        }
+
+    def get_auth_routes(self, clients):
+        anon = clients["anon"]
+        return {
+            "POST /auth/signup/": request(
+                anon,
+                "post",
+                "/api/v1/auth/signup/",
+                lambda: {
+                    "username": f"bench_new_{next(self.sequence)}",
+                    "email": f"bench_new_{next(self.sequence)}@yamdb.fake",
+                },
+            ),
+            "POST /auth/token/": request(
+                anon,
+                "post",
+                "/api/v1/auth/token/",
+                {
+                    "username": self.user.username,
+                    "confirmation_code": self.confirmation_code,
+                },
+            ),
+        }
@@ -0,0 +1,225 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Review
+from reviews.seeding import seed_catalog
+from users.models import User, UserRoles
+
+# Настройки SQLite по умолчанию: журнал отката, таймаут sqlite3 в 5 секунд,
+# отложенные транзакции и новое соединение на каждый запрос.
+STOCK = {
+    "journal_mode": "DELETE",
+    "pragmas": {},
+    "options": {"timeout": 5.0},
+    "age": 0,
+}
+
+
+def tuned_profile():
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    return {
+        "journal_mode": pragmas.get("journal_mode", "DELETE"),
+        "pragmas": pragmas,
+        "options": settings.DATABASES["default"].get("OPTIONS", {}),
+        "age": settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+    }
+
+
+def is_locked(error):
+    return "locked" in str(error) or "busy" in str(error)
+
+
+class Writer(threading.Thread):
+    """Клиент API в отдельном потоке.
+
+    Запросы идут через тестовый клиент со всеми middleware, поэтому
+    соединение открывается и закрывается по ``CONN_MAX_AGE``, а прагмы
+    ставит ``apply_pragmas``. По кругу: отзыв на следующее произведение
+    (транзакция со вставкой и пересчётом рейтинга и статистики),
+    статистика произведения и пакетная запись произведений.
+    """
+
+    def __init__(self, name, title_ids, category):
+        super().__init__()
+        self.title_ids = title_ids
+        self.category = category
+        self.deadline = None
+        self.user = User.objects.create_user(
+            username=f"stress-{name}",
+            email=f"stress-{name}@yamdb.fake",
+            role=UserRoles.ADMIN,
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.name = name
+        self.done = 0
+        self.locked = 0
+        self.error = None
+
+    def requests(self):
+        reviewed = count()
+        for step in count():
+            index = next(reviewed)
+            if index == len(self.title_ids):
+                # Все произведения с отзывом автора: снимаем их и идём
+                # на новый круг.
+                yield lambda: Review.objects.filter(author=self.user).delete()
+                reviewed = count(1)
+                index = 0
+            title_id = self.title_ids[index]
+            yield lambda title_id=title_id: self.client.post(
+                f"/api/v1/titles/{title_id}/reviews/",
+                {"text": "x" * 200, "score": 1 + step % 10},
+                format="json",
+            )
+            yield lambda title_id=title_id: self.client.get(
+                f"/api/v1/titles/{title_id}/stats/"
+            )
+            if step % 10 == 0:
+                yield lambda step=step: self.post_titles(step)
+
+    def post_titles(self, step):
+        response = self.client.post(
+            "/api/v1/titles/bulk/",
+            [
+                {
+                    "name": f"Стресс {self.name}-{step}-{idx}",
+                    "year": 2000,
+                    "category": self.category,
+                    "genre": [],
+                }
+                for idx in range(5)
+            ],
+            format="json",
+        )
+        # Ошибки элементов пакета приходят с кодом 200.
+        if response.status_code == 200 and response.data["errors"]:
+            raise AssertionError(response.data["errors"])
+        return response
+
+    def run(self):
+        requests = self.requests()
+        try:
+            while time.perf_counter() < self.deadline:
+                try:
+                    response = next(requests)()
+                except OperationalError as error:
+                    if not is_locked(error):
+                        raise
+                    self.locked += 1
+                    continue
+                if getattr(response, "status_code", 200) >= 400:
+                    raise AssertionError(
+                        f"{response.status_code}: {response.content[:200]}"
+                    )
+                self.done += 1
+        except Exception as error:
+            self.error = error
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагружает файл SQLite параллельными клиентами API с настройками по "
+        "умолчанию и с профилем из SQLITE_PRAGMAS и сравнивает долю "
+        "ошибок блокировки и пропускную способность"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--titles", type=int, default=200)
+
+    def handle(self, *args, **options):
+        profiles = {"stock": STOCK, "tuned": tuned_profile()}
+        database = connection.settings_dict
+        saved = {
+            key: database.get(key)
+            for key in ("TEST", "OPTIONS", "CONN_MAX_AGE")
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            database["TEST"] = dict(
+                database.get("TEST") or {},
+                NAME=os.path.join(directory, "stress.sqlite3"),
+            )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, keepdb=False
+            )
+            # Журнал запросов на каждый ответ залил бы вывод.
+            logging.disable(logging.CRITICAL)
+            try:
+                title_ids = seed_catalog(
+                    users=10,
+                    titles=options["titles"],
+                    reviews_per_title=0,
+                    comments_per_review=0,
+                )
+                category = Category.objects.values_list(
+                    "slug", flat=True
+                ).first()
+                self.stdout.write(
+                    f"{'profile':<10}{'requests':>10}{'locked':>10}"
+                    f"{'locked %':>10}{'rps':>10}"
+                )
+                for name, profile in profiles.items():
+                    done, locked = self.run(
+                        name, profile, title_ids, category, options
+                    )
+                    total = done + locked
+                    self.stdout.write(
+                        f"{name:<10}{done:>10}{locked:>10}"
+                        f"{locked / total * 100 if total else 0:>10.2f}"
+                        f"{done / options['seconds']:>10.0f}"
+                    )
+            finally:
+                logging.disable(logging.NOTSET)
+                database.update(saved)
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, name, profile, title_ids, category, options):
+        database = connection.settings_dict
+        # Режим журнала хранится в файле базы, и сменить его можно только
+        # без других соединений.
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        connection.close()
+        database["OPTIONS"] = dict(profile["options"])
+        database["CONN_MAX_AGE"] = profile["age"]
+        cache.clear()
+        with override_settings(
+            SQLITE_PRAGMAS=profile["pragmas"], API_THROTTLE_RATES={}
+        ):
+            writers = [
+                Writer(f"{name}-{number}", title_ids, category)
+                for number in range(options["writers"])
+            ]
+            connection.close()
+            deadline = time.perf_counter() + options["seconds"]
+            for writer in writers:
+                writer.deadline = deadline
+                writer.start()
+            for writer in writers:
+                writer.join()
+        for writer in writers:
+            if writer.error is not None:
+                raise writer.error
+        return (
+            sum(writer.done for writer in writers),
+            sum(writer.locked for writer in writers),
+        )
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .db_router import is_pinned, pin_to_primary, use_primary
+
+logger = logging.getLogger("api.requests")
+
+
+class RequestMetrics:
+    """Собирает SQL-запросы и длительность этапов одного HTTP-запроса."""
+
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.timings = defaultdict(float)
+        self.threads = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.queries.append((sql, duration))
+
+    @contextmanager
+    def track(self):
+        """Считает запросы соединений текущего потока.
+
+        Соединения у каждого потока свои, а под ASGI запрос к базе идёт
+        не в том потоке, где работает middleware. Повторный вызов в
+        потоке, где запросы уже считаются, ничего не делает.
+        """
+        thread = threading.get_ident()
+        if thread in self.threads:
+            yield
+            return
+        self.threads.add(thread)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield
+        finally:
+            self.threads.discard(thread)
+
+    @contextmanager
+    def measure(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - started
+
+    def server_timing(self, total):
+        parts = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{len(self.queries)} '
+            f'queries"'
+        ]
+        parts.extend(
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.timings.items()
+        )
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class AsyncCapableMiddleware:
+    """Основа middleware, которое работает и под WSGI, и под ASGI.
+
+    Как ``MiddlewareMixin`` Django: если следующий слой асинхронный,
+    вызов идёт через ``__acall__`` без перехода в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class RequestMetricsMiddleware(AsyncCapableMiddleware):
+    """Отдаёт метрики запроса в Server-Timing и пишет их в лог.
+
+    Запросы дольше ``API_SLOW_REQUEST_MS`` логируются с полным списком
+    SQL-запросов. Под ASGI запросы к базе считаются там, где view
+    переходит в поток (см. ``RequestMetrics.track``).
+    """
+
+    def handle(self, request):
+        request.metrics = RequestMetrics()
+        started = time.perf_counter()
+        with request.metrics.track():
+            response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        request.metrics = RequestMetrics()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, started)
+
+    def finish(self, request, response, started):
+        metrics = request.metrics
+        total = time.perf_counter() - started
+        response["Server-Timing"] = metrics.server_timing(total)
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "queries": len(metrics.queries),
+        }
+        record.update(
+            (f"{name}_ms", round(duration * 1000, 2))
+            for name, duration in metrics.timings.items()
+        )
+        threshold = getattr(settings, "API_SLOW_REQUEST_MS", None)
+        if threshold is not None and total * 1000 >= threshold:
+            record["sql"] = [
+                {"sql": sql, "ms": round(duration * 1000, 2)}
+                for sql, duration in metrics.queries
+            ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return response
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """Направляет безопасные запросы на реплики чтения.
+
+    После успешного изменяющего запроса клиент (по заголовку
+    Authorization, а без него — по адресу) на
+    ``DATABASE_REPLICA_PIN_SECONDS`` закрепляется за основной базой,
+    чтобы сразу видеть свои записи.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    @staticmethod
+    def get_client_id(request):
+        return request.META.get("HTTP_AUTHORIZATION") or request.META.get(
+            "REMOTE_ADDR", ""
+        )
+
+    def route(self, request):
+        """Выбирает базу для запроса; возвращает токен для сброса."""
+        safe = request.method in self.safe_methods
+        return use_primary.set(
+            not safe or is_pinned(self.get_client_id(request))
+        )
+
+    def finish(self, request, response, token):
+        use_primary.reset(token)
+        if request.method not in self.safe_methods and (
+            response.status_code < 400
+        ):
+            pin_to_primary(self.get_client_id(request))
+        return response
+
+    def handle(self, request):
+        token = self.route(request)
+        try:
+            response = self.get_response(request)
+        except Exception:
+            use_primary.reset(token)
+            raise
+        return self.finish(request, response, token)
+
+    async def __acall__(self, request):
+        # Контекстная переменная копируется в поток, где работает ORM.
+        token = self.route(request)
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            use_primary.reset(token)
+            raise
+        return self.finish(request, response, token)
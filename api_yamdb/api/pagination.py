@@ -0,0 +1,45 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class TitleCursorPagination(CursorPagination):
+    ordering = ("name", "id")
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ("-pub_date", "-id")
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """Постраничная пагинация с переключением на курсорную.
+
+    Если в запросе есть параметр ``cursor`` (в том числе пустой
+    ``?cursor=`` для первой страницы), выдача строится по ключу
+    сортировки ``cursor_pagination_class`` без COUNT и OFFSET.
+    """
+
+    cursor_pagination_class = None
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(CursorOptInPagination):
+    cursor_pagination_class = TitleCursorPagination
+
+
+class PubDatePagination(CursorOptInPagination):
+    cursor_pagination_class = PubDateCursorPagination
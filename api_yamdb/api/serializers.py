@@ -1,9 +1,14 @@
+from operator import itemgetter
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.leaderboard import ORDERS
+from reviews.models import Category, Comment, Genre, Review, Title, TitleStats
 from users.models import User
 
 
@@ -38,7 +43,7 @@ class CustomTokenObtainPairSerializer(serializers.Serializer):
         confirmation_code = attrs.get("confirmation_code")
         username = attrs.get("username")
         user = get_object_or_404(User, username=username)
-        if user.confirmation_code != confirmation_code:
+        if not user.check_confirmation_code(confirmation_code):
             raise ValidationError
         attrs["user"] = user
         return attrs
@@ -65,9 +70,7 @@ class GenreSerializer(GenreCategorySerializer):
 
 
 class TitleSerializerGet(serializers.ModelSerializer):
-    rating = serializers.IntegerField(
-        source="reviews__score__avg", read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
     category = CategorySerializer()
     genre = GenreSerializer(many=True, read_only=True)
 
@@ -97,6 +100,82 @@ class TitleSerializer(TitleSerializerGet):
         return TitleSerializerGet(value, context=self.context).data
 
 
+class SlugBulkSerializer(serializers.Serializer):
+    """Элемент пакетного создания категорий и жанров.
+
+    Уникальность слага проверяется для всего пакета одним запросом,
+    поэтому здесь UniqueValidator не нужен.
+    """
+
+    name = serializers.CharField(max_length=256)
+    slug = serializers.SlugField(max_length=50)
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Элемент пакетной записи произведений.
+
+    Элемент с ``id`` обновляет произведение, без него — создаёт новое.
+    Категория и жанры приходят слагами и разрешаются для всего пакета
+    разом, а не по запросу на элемент.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField(max_length=50, required=False)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=50), required=False
+    )
+    create_fields = ("name", "year", "category", "genre")
+
+    class Meta:
+        fields = ["id", "name", "year", "description", "category", "genre"]
+        model = Title
+        extra_kwargs = {
+            "name": {"required": False},
+            "year": {"required": False},
+        }
+
+    def validate(self, data):
+        if "id" not in data:
+            missing = {
+                field: [self.fields[field].error_messages["required"]]
+                for field in self.create_fields
+                if field not in data
+            }
+            if missing:
+                raise serializers.ValidationError(missing)
+        return data
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    scores = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        fields = ["review_count", "comment_count", "scores"]
+        model = TitleStats
+
+
+class TopTitlesQuerySerializer(serializers.Serializer):
+    """Параметры запроса ``/titles/top/``."""
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    year = serializers.IntegerField(required=False)
+    order = serializers.ChoiceField(choices=ORDERS, default=ORDERS[0])
+    min_reviews = serializers.IntegerField(
+        min_value=1,
+        default=lambda: getattr(settings, "TOP_TITLES_MIN_REVIEWS", 3),
+    )
+    limit = serializers.IntegerField(min_value=1, default=10)
+
+    def validate_limit(self, value):
+        limit = getattr(settings, "TOP_TITLES_MAX_LIMIT", 100)
+        if value > limit:
+            raise serializers.ValidationError(f"Не больше {limit}.")
+        return value
+
+
 class ReviewsSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field="username",
@@ -114,17 +193,6 @@ class ReviewsSerializer(serializers.ModelSerializer):
         ]
         model = Review
 
-    def validate(self, data):
-        if self.context["request"].method == "PATCH":
-            return data
-        title = self.context["view"].kwargs["title_id"]
-        author = self.context["request"].user
-        if Review.objects.filter(author=author, title__id=title).exists():
-            raise serializers.ValidationError(
-                "Нельзя оставлять более одного ревью!"
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -140,3 +208,110 @@ class CommentSerializer(serializers.ModelSerializer):
             "pub_date",
         ]
         model = Comment
+
+
+class FlatListSerializer(serializers.BaseSerializer):
+    """Сериализатор списков из строк ``.values()``.
+
+    Экземпляры моделей и дерево полей не строятся: ``columns`` задаёт для
+    каждого поля ответа колонки выборки, а значение берётся из колонки
+    или из метода ``represent_<поле>``. Результат совпадает с обычным
+    сериализатором ресурса. Поля можно сузить через ``fields`` в
+    контексте. Только для чтения.
+    """
+
+    columns = {}
+    pub_date_field = serializers.DateTimeField()
+
+    @classmethod
+    def get_rows(cls, queryset, fields=None, extra=()):
+        names = dict.fromkeys(("id",) + tuple(extra))
+        for field in fields or cls.columns:
+            names.update(dict.fromkeys(cls.columns[field]))
+        return queryset.values(*names)
+
+    @cached_property
+    def getters(self):
+        getters = []
+        for field in self.context.get("fields") or self.columns:
+            getter = getattr(self, f"represent_{field}", None)
+            if getter is None:
+                getter = itemgetter(self.columns[field][0])
+            getters.append((field, getter))
+        return getters
+
+    def to_representation(self, row):
+        return {field: getter(row) for field, getter in self.getters}
+
+    def represent_pub_date(self, row):
+        return self.pub_date_field.to_representation(row["pub_date"])
+
+    def represent_author(self, row):
+        return row["author__username"]
+
+
+class FlatTitleListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rows = list(data)
+        fields = self.child.context.get("fields")
+        if fields and "genre" not in fields:
+            return [self.child.to_representation(row) for row in rows]
+        genres = {}
+        for title_id, name, slug in Title.genre.through.objects.filter(
+            title_id__in=[row["id"] for row in rows]
+        ).order_by("genre__name").values_list(
+            "title_id", "genre__name", "genre__slug"
+        ):
+            genres.setdefault(title_id, []).append(
+                {"name": name, "slug": slug}
+            )
+        for row in rows:
+            row["genre"] = genres.get(row["id"], [])
+        return [self.child.to_representation(row) for row in rows]
+
+
+class FlatTitleSerializer(FlatListSerializer):
+    columns = {
+        "id": ("id",),
+        "name": ("name",),
+        "year": ("year",),
+        "rating": ("rating_sum", "rating_count"),
+        "description": ("description",),
+        "genre": (),
+        "category": ("category__name", "category__slug"),
+    }
+
+    class Meta:
+        list_serializer_class = FlatTitleListSerializer
+
+    def represent_rating(self, row):
+        if not row["rating_count"]:
+            return None
+        return int(row["rating_sum"] / row["rating_count"])
+
+    def represent_genre(self, row):
+        return row["genre"]
+
+    def represent_category(self, row):
+        if row["category__slug"] is None:
+            return None
+        return {"name": row["category__name"], "slug": row["category__slug"]}
+
+
+class FlatReviewSerializer(FlatListSerializer):
+    columns = {
+        "id": ("id",),
+        "text": ("text",),
+        "author": ("author__username",),
+        "score": ("score",),
+        "pub_date": ("pub_date",),
+    }
+
+
+class FlatCommentSerializer(FlatListSerializer):
+    columns = {
+        "id": ("id",),
+        "text": ("text",),
+        "author": ("author__username",),
+        "pub_date": ("pub_date",),
+    }
@@ -0,0 +1,34 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User, users_changed
+
+from .cache import bump_version, forget_users
+
+VERSIONED_MODELS = (Category, Genre, Title, Review, Comment, User)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    if sender in VERSIONED_MODELS:
+        bump_version(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_version(Title)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+
+@receiver(users_changed)
+def invalidate_updated_users(sender, pks, **kwargs):
+    bump_version(User)
+    forget_users(pks)
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite прагмами из ``SQLITE_PRAGMAS``.
+
+    Прагмы выполняются напрямую через sqlite3, мимо обёрток Django, чтобы
+    не попадать в метрики и счётчики запросов.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
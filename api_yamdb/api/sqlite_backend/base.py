@@ -0,0 +1,32 @@
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "EXCLUSIVE", "IMMEDIATE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с режимом транзакций ``transaction_mode`` из ``OPTIONS``.
+
+    Как в Django 5.1: с ``IMMEDIATE`` блок atomic() начинается с
+    ``BEGIN IMMEDIATE`` и сразу берёт блокировку записи, ожидая её по
+    ``timeout``. Отложенная транзакция, которая сначала читает, а потом
+    пишет, получает «database is locked» сразу, без ожидания, если
+    запись уже держит другое соединение.
+    """
+
+    transaction_mode = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        mode = kwargs.pop("transaction_mode", None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ValueError(
+                f"transaction_mode должен быть одним из {TRANSACTION_MODES}"
+            )
+        self.transaction_mode = mode and mode.upper()
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
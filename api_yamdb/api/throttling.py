@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """Ёмкость корзины и пополнение в секунду из строки вида ``5/min``."""
+    if rate is None:
+        return None
+    number, period = rate.split("/")
+    capacity = int(number)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class BucketStore:
+    """Хранилище корзин token bucket: ключ -> (жетоны, время).
+
+    Наследники задают ``get`` и ``set``; ``timeout`` — через сколько
+    секунд корзина снова полна и запись можно забыть.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, bucket, timeout):
+        raise NotImplementedError
+
+    def take(self, key, capacity, rate, now):
+        """Берёт жетон из корзины ``key``.
+
+        Возвращает 0, если жетон был, иначе сколько секунд ждать
+        следующего.
+        """
+        tokens, updated = self.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens < 1:
+            return (1 - tokens) / rate
+        tokens -= 1
+        self.set(key, (tokens, now), (capacity - tokens) / rate)
+        return 0
+
+
+class LRUBucketStore(BucketStore):
+    """Корзины в памяти процесса, не больше ``API_THROTTLE_LRU_SIZE``.
+
+    Самое дешёвое хранилище, но у каждого процесса свои счётчики.
+    Вытесненная корзина считается полной.
+    """
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.max_size = getattr(settings, "API_THROTTLE_LRU_SIZE", 10000)
+
+    def get(self, key):
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                self.buckets.move_to_end(key)
+            return bucket
+
+    def set(self, key, bucket, timeout):
+        with self.lock:
+            self.buckets[key] = bucket
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.max_size:
+                self.buckets.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore(BucketStore):
+    """Корзины в кэше Django.
+
+    Процессы делят корзины, только если кэш ``default`` общий для них:
+    с LocMemCache у каждого процесса свои корзины. Чтение и запись не
+    атомарны, поэтому при одновременных запросах с одного ключа корзина
+    может пропустить лишний запрос.
+    """
+
+    def get(self, key):
+        return cache.get(key)
+
+    def set(self, key, bucket, timeout):
+        cache.set(key, bucket, math.ceil(timeout))
+
+
+@lru_cache(maxsize=None)
+def load_bucket_store(path):
+    return import_string(path)()
+
+
+def get_bucket_store():
+    return load_bucket_store(
+        getattr(
+            settings, "API_THROTTLE_STORE", "api.throttling.CacheBucketStore"
+        )
+    )
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket для ``throttle_scope`` view.
+
+    Лимит берётся из ``API_THROTTLE_RATES`` по ключу
+    ``<throttle_scope>_<kind>``. Проверка читает только заголовки и тело
+    запроса, так что отказ обходится без обращения к базе.
+    """
+
+    kind = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = f"{view.throttle_scope}_{self.kind}"
+        rate = parse_rate(
+            getattr(settings, "API_THROTTLE_RATES", {}).get(scope)
+        )
+        ident = self.get_ident_key(request)
+        if rate is None or ident is None:
+            return True
+        self.wait_seconds = get_bucket_store().take(
+            f"api:throttle:{scope}:{ident}", *rate, time.time()
+        )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Лимит на адрес клиента, с учётом ``NUM_PROXIES`` из настроек DRF."""
+
+    kind = "ip"
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Лимит на имя пользователя из тела запроса.
+
+    Не даёт перебирать код подтверждения одного пользователя с разных
+    адресов.
+    """
+
+    kind = "username"
+
+    def get_ident_key(self, request):
+        data = request.data
+        username = data.get("username") if hasattr(data, "get") else None
+        if not username or not isinstance(username, str):
+            return None
+        return md5(username.encode()).hexdigest()
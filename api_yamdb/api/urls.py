@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
+from .async_views import with_async_reads
 from .views import (
     CategoryViewSet,
     CommentViewSet,
@@ -29,6 +31,14 @@ router.register(
     basename="review-comments",
 )
 
+# Чтение этих viewset под ASGI обслуживает AsyncReader.
+ASYNC_READ_VIEWSETS = (
+    CategoryViewSet,
+    GenreViewSet,
+    TitleViewSet,
+    ReviewsViewSet,
+)
+
 auth_urls = [
     path(
         "token/",
@@ -38,7 +48,15 @@ auth_urls = [
     path("signup/", UserCreateView.as_view(), name="user-create"),
 ]
 
-urlpatterns = [
-    path("", include(router.urls)),
-    path("auth/", include(auth_urls)),
-]
+
+def get_api_urls(async_reads):
+    router_urls = router.urls
+    if async_reads:
+        router_urls = with_async_reads(router_urls, ASYNC_READ_VIEWSETS)
+    return [
+        path("", include(router_urls)),
+        path("auth/", include(auth_urls)),
+    ]
+
+
+urlpatterns = get_api_urls(getattr(settings, "API_ASYNC_READS", False))
@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics, permissions, status, viewsets
+from rest_framework import filters, generics, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
@@ -12,10 +14,14 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.leaderboard import top_title_ids
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.stats import get_stats
 from users.models import User
 
-from .filters import TitlesFilter
+from .bulk import write_slugged, write_titles
+from .filters import FullTextSearchFilter, TitlesFilter
+from .pagination import PubDatePagination, TitlePagination
 from .permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
@@ -25,22 +31,36 @@ from .serializers import (
     CategorySerializer,
     CommentSerializer,
     CustomTokenObtainPairSerializer,
+    FlatCommentSerializer,
+    FlatReviewSerializer,
+    FlatTitleSerializer,
     GenreSerializer,
     ReviewsSerializer,
     TitleSerializer,
     TitleSerializerGet,
+    TitleStatsSerializer,
+    TopTitlesQuerySerializer,
     UserBasicSerializer,
     UserCreateSerializer,
     UserRetrieveUpdateSerializer
 )
-from .viewsets import CreateListDestroyViewSet
+from .throttling import IPThrottle, UsernameThrottle
+from .viewsets import (
+    CachedResponseMixin,
+    ConditionalModelViewSet,
+    CreateListDestroyViewSet,
+    FlatListMixin,
+    InstrumentedViewMixin,
+    SparseFieldsMixin
+)
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, ConditionalModelViewSet):
     serializer_class = UserBasicSerializer
     queryset = User.objects.all()
+    cache_models = (User,)
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
     pagination_class = PageNumberPagination
@@ -70,15 +90,18 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserCreateView(generics.CreateAPIView):
+class UserCreateView(InstrumentedViewMixin, generics.CreateAPIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = "signup"
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
 
     def perform_create(self, serializer):
-        user = serializer.save()
-        user.generate_confirmation_code()
-        user.save()
+        # Пользователь без письма с кодом не смог бы получить токен.
+        with transaction.atomic():
+            user = serializer.save()
+            user.generate_confirmation_code()
 
     def create(self, request, *args, **kwargs):
         username = request.data.get("username")
@@ -86,7 +109,6 @@ class UserCreateView(generics.CreateAPIView):
         try:
             existing_user = User.objects.get(username=username, email=email)
             existing_user.generate_confirmation_code()
-            existing_user.save()
             response_data = {"email": email, "username": username}
             return Response(response_data, status=status.HTTP_200_OK)
         except User.DoesNotExist:
@@ -97,8 +119,10 @@ class UserCreateView(generics.CreateAPIView):
         return response
 
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(InstrumentedViewMixin, TokenObtainPairView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = "token"
     serializer_class = CustomTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
@@ -112,16 +136,21 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class CategoryGenreViewSet(CreateListDestroyViewSet):
+class CategoryGenreViewSet(CachedResponseMixin, CreateListDestroyViewSet):
     filter_backends = (SearchFilter,)
     search_fields = ("name",)
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = "slug"
 
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        return Response(write_slugged(self.queryset.model, request.data))
+
 
 class CategoryViewSet(CategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, SearchFilter)
     search_fields = ("name",)
@@ -131,57 +160,167 @@ class CategoryViewSet(CategoryGenreViewSet):
 class GenreViewSet(CategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, SearchFilter)
     search_fields = ("name",)
     lookup_field = "slug"
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CachedResponseMixin, FlatListMixin, ConditionalModelViewSet
+):
     queryset = (
-        Title.objects.all().annotate(Avg("reviews__score")).order_by("name")
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("name")
     )
     serializer_class = TitleSerializer
+    flat_serializer_class = FlatTitleSerializer
+    sparse_field_sources = {"rating": ("rating_sum", "rating_count")}
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitlesFilter
+    pagination_class = TitlePagination
     http_method_names = ["get", "post", "patch", "delete"]
+    cache_models = (Title, Category, Genre, Review)
 
     def get_serializer_class(self):
-        if self.request.method == "GET":
+        if self.request.method == "GET" and not self.use_flat_list():
             return TitleSerializerGet
-        return TitleSerializer
+        return super().get_serializer_class()
 
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        return Response(write_titles(request.data))
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+    @action(methods=["GET"], detail=True, url_path="stats")
+    def stats(self, request, pk=None):
+        # Без get_object: строка статистики сама проверяет существование
+        # произведения, так что ответ обходится одним запросом.
+        try:
+            stats = get_stats(int(pk))
+        except ValueError:
+            raise Http404
+        if stats is None:
+            raise Http404
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(methods=["GET"], detail=False, url_path="top")
+    def top(self, request):
+        return self.versioned_response(self.get_top, request)
+
+    def get_top(self, request):
+        """Лучшие произведения из таблицы рейтинга, по убыванию оценки.
+
+        Запросов всегда три: места в рейтинге по индексу, строки
+        произведений и их жанры.
+        """
+        query = TopTitlesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        scores = dict(top_title_ids(**query.validated_data))
+        rows = FlatTitleSerializer.get_rows(
+            Title.objects.filter(pk__in=scores)
+        )
+        titles = {
+            item["id"]: item
+            for item in FlatTitleSerializer(rows, many=True).data
+        }
+        return Response(
+            [
+                dict(titles[pk], score=round(score, 2))
+                for pk, score in scores.items()
+            ]
+        )
+
+
+class ReviewsViewSet(FlatListMixin, ConditionalModelViewSet):
     serializer_class = ReviewsSerializer
+    flat_serializer_class = FlatReviewSerializer
     permission_classes = (IsAuthorOrAdminOrModeratorOrReadOnly,)
+    pagination_class = PubDatePagination
+    filter_backends = (FullTextSearchFilter,)
     http_method_names = ["get", "post", "patch", "delete"]
+    cache_models = (Review, Title, User)
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get("title_id"))
+        """Произведение из URL; ищется один раз за запрос."""
+        if not hasattr(self, "_title"):
+            self._title = get_object_or_404(
+                Title.objects.only("id"), id=self.kwargs.get("title_id")
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        # Чтение не загружает произведение: оно ищется, только если
+        # страница пуста (см. paginate_queryset).
+        return (
+            Review.objects.filter(title_id=self.kwargs.get("title_id"))
+            .select_related("author")
+            .order_by("-pub_date", "-id")
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница: отличаем несуществующее произведение (404)
+            # от произведения без отзывов.
+            self.get_title()
+        return page
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Повторный отзыв отсекает ограничение unique_author_review в базе,
+        # а не отдельный запрос перед вставкой. Отзыв автора ищется только
+        # после ошибки, чтобы отличить её от прочих нарушений целостности.
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title=title
+            ).exists():
+                raise
+            raise ValidationError(
+                {"non_field_errors": ["Нельзя оставлять более одного ревью!"]}
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(FlatListMixin, ConditionalModelViewSet):
     serializer_class = CommentSerializer
+    flat_serializer_class = FlatCommentSerializer
     permission_classes = (IsAuthorOrAdminOrModeratorOrReadOnly,)
+    pagination_class = PubDatePagination
     http_method_names = ["get", "post", "patch", "delete"]
+    cache_models = (Comment, Review, User)
 
     def get_review(self):
-        title_id = self.kwargs.get("title_id")
-        review_id = self.kwargs.get("review_id")
-
-        review = get_object_or_404(Review, id=review_id, title__id=title_id)
-        return review
+        """Отзыв из URL; ищется один раз за запрос."""
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review.objects.only("id", "title_id"),
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return (
+            Comment.objects.filter(
+                review_id=self.kwargs.get("review_id"),
+                review__title_id=self.kwargs.get("title_id"),
+            )
+            .select_related("author")
+            .order_by("-pub_date", "-id")
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница: отличаем несуществующий отзыв или отзыв к
+            # другому произведению (404) от отзыва без комментариев.
+            self.get_review()
+        return page
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
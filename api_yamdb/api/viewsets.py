@@ -1,10 +1,297 @@
-from rest_framework import mixins, viewsets
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .cache import (
+    HITS_KEY,
+    MISSES_KEY,
+    get_etag,
+    get_last_modified,
+    get_response_key,
+    get_timeout,
+    get_versions,
+    increment
+)
+from .db_router import is_recent, primary_reads
+
+
+class InstrumentedViewMixin:
+    """Добавляет время view и сериализаторов в метрики запроса.
+
+    Метрики собирает ``RequestMetricsMiddleware``; без него миксин
+    ничего не делает. Запросы к базе считаются и тогда, когда view
+    под ASGI работает не в потоке middleware.
+    """
+
+    def measure(self, name):
+        metrics = getattr(self.request, "metrics", None)
+        if metrics is None:
+            return nullcontext()
+        return metrics.measure(name)
+
+    def dispatch(self, request, *args, **kwargs):
+        metrics = getattr(request, "metrics", None)
+        if metrics is None:
+            return super().dispatch(request, *args, **kwargs)
+        with metrics.track(), metrics.measure("view"):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        for method in ("to_representation", "is_valid"):
+            original = getattr(serializer, method)
+
+            def timed(*args, _original=original, **kwargs):
+                with self.measure("serializer"):
+                    return _original(*args, **kwargs)
+
+            setattr(serializer, method, timed)
+        return serializer
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на повторное чтение, пока не изменятся ``cache_models``.
+
+    ETag и Last-Modified строятся по версиям моделей до сериализации,
+    поэтому неизменившийся ответ не собирается заново. Ответ по версии,
+    сдвинутой в последние ``DATABASE_REPLICA_PIN_SECONDS``, читается из
+    основной базы, по более старой — с реплики.
+    """
+
+    cache_models = ()
+
+    def versioned_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.cache_models)
+        key = get_response_key(request, self.basename, versions)
+        etag = get_etag(key)
+        last_modified = get_last_modified(versions)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            # Ответ получает ETag текущей версии и ложится в кэш под ней.
+            # Пока версия свежая, реплика могла не получить выставившую её
+            # запись, и ответ читается из основной базы; потом — с реплики.
+            reads = nullcontext()
+            if versions and is_recent(max(versions)):
+                reads = primary_reads()
+            with reads:
+                response = self.build_response(
+                    key, handler, request, *args, **kwargs
+                )
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def build_response(self, key, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(super().list, request, *args, **kwargs)
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """Кэширует ответы на чтение, пока не изменятся ``cache_models``."""
+
+    def build_response(self, key, handler, request, *args, **kwargs):
+        data = cache.get(key)
+        if data is not None:
+            increment(HITS_KEY)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+        increment(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, get_timeout())
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class SparseFieldsMixin:
+    """Поля ответа на чтение по ``?fields=a,b`` или ``?omit=a,b``.
+
+    Сужаются и сериализатор, и запрос: ``.only()`` выбирает колонки
+    нужных полей, а select_related и prefetch_related остаются только
+    для запрошенных связей. ``sparse_field_sources`` задаёт поля модели
+    для полей сериализатора, которые называются иначе.
+    """
+
+    fields_param = "fields"
+    omit_param = "omit"
+    sparse_field_sources = {}
+
+    def get_available_fields(self):
+        serializer_class = self.get_serializer_class()
+        columns = getattr(serializer_class, "columns", None)
+        if columns is not None:
+            return list(columns)
+        return list(serializer_class().fields)
+
+    @staticmethod
+    def parse_fields(value):
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    def get_requested_fields(self):
+        """Запрошенные поля в порядке сериализатора или ``None``."""
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+        self._requested_fields = None
+        params = self.request.query_params
+        if self.request.method != "GET" or not (
+            self.fields_param in params or self.omit_param in params
+        ):
+            return None
+        available = self.get_available_fields()
+        requested = self.parse_fields(params.get(self.fields_param, ""))
+        omitted = self.parse_fields(params.get(self.omit_param, ""))
+        unknown = set(requested + omitted) - set(available)
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        self._requested_fields = [
+            name
+            for name in available
+            if (not requested or name in requested) and name not in omitted
+        ]
+        return self._requested_fields
+
+    def get_key_fields(self, queryset):
+        """Поля сортировки: они нужны пагинации, даже если не запрошены."""
+        ordering = list(queryset.query.order_by)
+        cursor = getattr(
+            self.pagination_class, "cursor_pagination_class", None
+        )
+        if cursor is not None:
+            ordering.extend(cursor.ordering)
+        names = {field.name for field in queryset.model._meta.concrete_fields}
+        keys = (name.lstrip("-") for name in ordering)
+        return tuple(dict.fromkeys(key for key in keys if key in names))
+
+    def get_field_sources(self, fields):
+        return [
+            source
+            for field in fields
+            for source in self.sparse_field_sources.get(field, (field,))
+        ]
+
+    def trim_queryset(self, queryset, fields):
+        sources = self.get_field_sources(fields)
+        columns = {
+            field.name
+            for field in queryset.model._meta.get_fields()
+            if field.concrete and not field.many_to_many
+        }
+        selected = queryset.query.select_related
+        keep_selected = [
+            name
+            for name in (selected if isinstance(selected, dict) else ())
+            if name in sources
+        ]
+        keep_prefetched = [
+            lookup
+            for lookup in queryset._prefetch_related_lookups
+            if lookup in sources
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if keep_selected:
+            queryset = queryset.select_related(*keep_selected)
+        if keep_prefetched:
+            queryset = queryset.prefetch_related(*keep_prefetched)
+        only = [
+            source
+            for source in sources + list(self.get_key_fields(queryset))
+            if source in columns
+        ]
+        return queryset.only(*only) if only else queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is None or self.action not in ("list", "retrieve"):
+            return queryset
+        return self.trim_queryset(queryset, fields)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_requested_fields()
+        target = getattr(serializer, "child", serializer)
+        if fields is not None and isinstance(target, serializers.Serializer):
+            for name in set(target.fields) - set(fields):
+                target.fields.pop(name)
+        return serializer
+
+
+class FlatListMixin(SparseFieldsMixin):
+    """Отдаёт список строками ``.values()`` через ``flat_serializer_class``.
+
+    Фильтры и пагинация работают как обычно, но страница выбирается без
+    создания экземпляров моделей, а ``?fields=`` сужает и саму выборку.
+    Выключается настройкой ``API_FLAT_LIST_SERIALIZERS``.
+    """
+
+    flat_serializer_class = None
+
+    def use_flat_list(self):
+        return (
+            self.action == "list"
+            and self.flat_serializer_class is not None
+            and getattr(settings, "API_FLAT_LIST_SERIALIZERS", True)
+        )
+
+    def trim_queryset(self, queryset, fields):
+        if self.use_flat_list():
+            return queryset
+        return super().trim_queryset(queryset, fields)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_flat_list():
+            queryset = self.flat_serializer_class.get_rows(
+                queryset,
+                self.get_requested_fields(),
+                self.get_key_fields(queryset),
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.use_flat_list():
+            return self.flat_serializer_class
+        return super().get_serializer_class()
 
 
 class CreateListDestroyViewSet(
+    InstrumentedViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class ConditionalModelViewSet(
+    InstrumentedViewMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(
+            super().retrieve, request, *args, **kwargs
+        )
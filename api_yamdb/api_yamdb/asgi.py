@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+# Асинхронные обработчики чтения имеют смысл только под ASGI.
+os.environ.setdefault("API_ASYNC_READS", "True")
 
 application = get_asgi_application()
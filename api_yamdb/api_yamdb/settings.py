@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -29,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
+    "api.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -64,24 +67,148 @@ WSGI_APPLICATION = "api_yamdb.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "api.sqlite_backend",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        # Соединение живёт между запросами вместо открытия на каждый.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        # Ждать освобождения блокировки записи, а не падать с
+        # "database is locked". Транзакции atomic() берут блокировку
+        # записи сразу (BEGIN IMMEDIATE): иначе транзакция, которая
+        # сначала читает, падает без ожидания, если пишет кто-то ещё.
+        "OPTIONS": {"timeout": 20, "transaction_mode": "IMMEDIATE"},
     }
 }
 
+# Прагмы для каждого нового соединения с SQLite: WAL не даёт читателям
+# блокировать запись, synchronous=NORMAL в режиме WAL не теряет
+# целостность, mmap ускоряет чтение.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 20000,
+}
+
+# Реплики только для чтения: пути к файлам баз через запятую в DB_REPLICAS.
+# В тестах реплики указывают на тестовую основную базу.
+for index, path in enumerate(
+    filter(None, os.getenv("DB_REPLICAS", "").split(","))
+):
+    DATABASES[f"replica{index}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": path,
+        "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],
+        "OPTIONS": {"timeout": 20},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["api.db_router.ReplicaRouter"]
+# Сколько секунд клиент читает из основной базы после своей записи.
+DATABASE_REPLICA_PIN_SECONDS = 5
+# Как часто перепроверять доступность реплики, в секундах.
+DATABASE_REPLICA_CHECK_INTERVAL = 5
+
+# В кэше default лежат версии данных, по которым сбрасываются ответы API
+# и считаются ETag, кэш пользователей и счётчики лимитов. LocMemCache
+# годится только для одного процесса: запись в одном воркере не сбросит
+# ответы и версии данных в других. Они отдают устаревшие ответы и 304 на
+# старый ETag, пока не истечёт API_CACHE_TIMEOUT: в кэше процесса версии
+# живут столько же, сколько ответы. Для нескольких воркеров задайте общий
+# бэкенд в CACHE_BACKEND и CACHE_LOCATION, например
+# django.core.cache.backends.filebased.FileBasedCache или memcached.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Время жизни закэшированных ответов API на чтение, в секундах.
+API_CACHE_TIMEOUT = 60 * 5
+# Сколько секунд аутентификация берёт пользователя из кэша, а не из базы.
+# Только с общим кэшем: с LocMemCache пользователь читается из базы.
+API_USER_CACHE_TIMEOUT = 60
+# Наибольшее число объектов в одном запросе к /bulk/.
+API_BULK_MAX_ITEMS = 1000
+# Списки произведений, отзывов и комментариев собираются из .values().
+API_FLAT_LIST_SERIALIZERS = True
+# Чтение произведений, жанров, категорий и отзывов идёт через асинхронные
+# обработчики (api.async_views): под ASGI запрос обходится одним
+# переходом в поток вместо двух. Под WSGI Django запускал бы каждый из
+# них в своём цикле событий, поэтому включает их только api_yamdb/asgi.py.
+API_ASYNC_READS = os.getenv("API_ASYNC_READS", "False") == "True"
+
+# /titles/top/: по умолчанию в рейтинг попадают произведения хотя бы с
+# TOP_TITLES_MIN_REVIEWS оценками. Байесовская оценка тянет среднее к
+# TOP_TITLES_PRIOR_MEAN с весом TOP_TITLES_PRIOR_WEIGHT оценок; после
+# смены этих значений рейтинг пересчитывает rebuild_ratings.
+TOP_TITLES_MIN_REVIEWS = 3
+TOP_TITLES_PRIOR_MEAN = 5.5
+TOP_TITLES_PRIOR_WEIGHT = 5
+TOP_TITLES_MAX_LIMIT = 100
+
+# Token bucket для регистрации и получения токена: "N/период" — не
+# больше N запросов подряд, затем N за период. Счётчики хранятся в
+# API_THROTTLE_STORE: CacheBucketStore держит их в кэше default и общий
+# для процессов, только если общий сам кэш; с LocMemCache у каждого
+# процесса свои корзины, и лимит фактически умножается на число
+# процессов. LRUBucketStore всегда живёт в памяти одного процесса.
+API_THROTTLE_RATES = {
+    "signup_ip": "20/hour",
+    "signup_username": "5/hour",
+    "token_ip": "60/hour",
+    "token_username": "10/hour",
+}
+API_THROTTLE_STORE = "api.throttling.CacheBucketStore"
+API_THROTTLE_LRU_SIZE = 10000
+
+# Поисковый движок для ?q= и фильтра по названию произведения.
+SEARCH_BACKEND = "reviews.search.SqliteSearchBackend"
+
 AUTH_USER_MODEL = "users.User"
 
+# Запросы дольше этого порога логируются вместе со списком SQL-запросов.
+API_SLOW_REQUEST_MS = 500
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.requests": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    # Сколько прокси стоит перед приложением. При 0 адресом клиента для
+    # лимитов служит REMOTE_ADDR, а X-Forwarded-For, который клиент может
+    # подделать, не читается.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 0)),
 }
 
+# MessagePack доступен по Accept: application/msgpack, если установлен msgpack.
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].insert(
+        1, "api.renderers.MessagePackRenderer"
+    )
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
@@ -91,6 +218,20 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Коды подтверждения подписываются HMAC и проверяются без записи в базу.
+CONFIRMATION_CODE_STATELESS = True
+# Срок действия кода подтверждения в секундах.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+
+# Письма ставятся в очередь и уходят командой send_outbox. В режиме EAGER
+# письмо отправляется сразу при постановке в очередь.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Задержка перед повторной отправкой в секундах, удваивается с каждой
+# неудачной попыткой.
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_LEASE = 300
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
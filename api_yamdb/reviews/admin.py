@@ -2,10 +2,18 @@ from django import forms
 from django.contrib import admin
 
 from .models import Category, Comment, Genre, Review, Title
+from .search import get_search_backend
+
+
+class FullTextSearchMixin:
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_search_backend().search(queryset, search_term), False
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ["id", "name", "description"]
     list_filter = ["name", "description"]
     search_fields = ["name"]
@@ -20,7 +28,7 @@ class ReviewAdminForm(forms.ModelForm):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(FullTextSearchMixin, admin.ModelAdmin):
     title = forms.ModelChoiceField(queryset=Title.objects.all(), required=True)
     list_display = ["text", "id", "pub_date", "author"]
     list_filter = ["author", "pub_date"]
@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+from .models import Title, TitleRanking
+
+ORDERS = ("average", "bayesian")
+
+
+def get_prior():
+    """Среднее и вес априорной оценки для байесовского рейтинга."""
+    return (
+        getattr(settings, "TOP_TITLES_PRIOR_MEAN", 5.5),
+        getattr(settings, "TOP_TITLES_PRIOR_WEIGHT", 5),
+    )
+
+
+def get_score_updates(total, count, empty):
+    """Выражения средней и байесовской оценок для UPDATE.
+
+    ``total`` и ``count`` — новые сумма и число оценок, ``empty`` —
+    условие, при котором у произведения не останется оценок.
+    """
+    mean, weight = get_prior()
+    total = Cast(total, FloatField())
+    average = Case(
+        When(empty, then=Value(None)),
+        default=total / count,
+        output_field=FloatField(),
+    )
+    bayesian = average
+    if weight:
+        bayesian = (total + mean * weight) / (count + weight)
+    return {"average": average, "bayesian": bayesian}
+
+
+def change_ranking(title_id, score_delta, count_delta):
+    """Сдвигает оценки произведения в рейтинге одним UPDATE.
+
+    Обе оценки пересчитываются в базе из новых суммы и количества, и
+    чтение перед записью не нужно.
+    """
+    if not (score_delta or count_delta):
+        return
+    total = F("rating_sum") + score_delta
+    count = F("rating_count") + count_delta
+    TitleRanking.objects.filter(title_id=title_id).update(
+        rating_sum=total,
+        rating_count=count,
+        **get_score_updates(total, count, Q(rating_count=-count_delta)),
+    )
+
+
+def sync_ranking(title, created):
+    """Переносит в рейтинг категорию и год сохранённого произведения."""
+    if created or not TitleRanking.objects.filter(title_id=title.pk).update(
+        category_id=title.category_id, year=title.year
+    ):
+        rebuild_ranking(Title.objects.filter(pk=title.pk))
+
+
+def rebuild_ranking(titles=None):
+    """Пересчитывает строки рейтинга по сохранённым оценкам произведений.
+
+    Строки вставляются через INSERT ... SELECT, поэтому число запросов
+    не зависит от числа произведений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    pks, params = titles.order_by().values("pk").query.sql_with_params()
+    ranking = TitleRanking._meta.db_table
+    title = Title._meta.db_table
+    through = Title.genre.through._meta.db_table
+    columns = (
+        "title_id, genre_id, category_id, year, rating_sum, rating_count"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        TitleRanking.objects.filter(title__in=titles).delete()
+        cursor.execute(
+            f"INSERT INTO {ranking} ({columns}) "
+            f"SELECT id, NULL, category_id, year, rating_sum, rating_count "
+            f"FROM {title} WHERE id IN ({pks})",
+            params,
+        )
+        cursor.execute(
+            f"INSERT INTO {ranking} ({columns}) "
+            f"SELECT t.id, g.genre_id, t.category_id, t.year, t.rating_sum, "
+            f"t.rating_count FROM {through} g "
+            f"JOIN {title} t ON t.id = g.title_id "
+            f"WHERE g.title_id IN ({pks})",
+            params,
+        )
+        return TitleRanking.objects.filter(title__in=titles).update(
+            **get_score_updates(
+                F("rating_sum"), F("rating_count"), Q(rating_count=0)
+            )
+        )
+
+
+def top_title_ids(
+    order="average",
+    min_reviews=1,
+    category=None,
+    genre=None,
+    year=None,
+    limit=10,
+):
+    """Первичные ключи лучших произведений с их оценкой, по убыванию.
+
+    Для каждого сочетания жанра (или строк без жанра), категории и года
+    есть индекс, уже упорядоченный по ``order``, поэтому выборка идёт по
+    нему без сортировки и останавливается на ``limit`` строках. Строки
+    с меньше чем ``min_reviews`` оценками пропускаются по ходу обхода:
+    если порогу отвечают немногие произведения, обход дойдёт до конца
+    среза жанра, категории и года.
+    """
+    rows = TitleRanking.objects.filter(rating_count__gte=min_reviews)
+    if genre is None:
+        rows = rows.filter(genre__isnull=True)
+    else:
+        rows = rows.filter(genre__slug=genre)
+    if category is not None:
+        rows = rows.filter(category__slug=category)
+    if year is not None:
+        rows = rows.filter(year=year)
+    return list(
+        rows.order_by(f"-{order}", "-rating_count", "-title_id").values_list(
+            "title_id", order
+        )[:limit]
+    )
@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from reviews.models import Comment, Review, Title
+from reviews.seeding import seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Наполняет временную базу синтетическими отзывами и сравнивает "
+        "планы и время горячих запросов с индексами и без них"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--reviews-per-title",
+            type=int,
+            default=1000,
+            help="по умолчанию 1000 × 1000 = миллион отзывов",
+        )
+        parser.add_argument("--comments-per-review", type=int, default=1)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=False
+        )
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        started = time.perf_counter()
+        title_ids = seed_catalog(
+            users=options["users"],
+            titles=options["titles"],
+            reviews_per_title=options["reviews_per_title"],
+            comments_per_review=options["comments_per_review"],
+        )
+        self.stdout.write(
+            f"Наполнение: {Review.objects.count()} отзывов, "
+            f"{Comment.objects.count()} комментариев "
+            f"за {time.perf_counter() - started:.1f} с"
+        )
+        title_id = title_ids[len(title_ids) // 2]
+        review = Review.objects.filter(title_id=title_id).first()
+        queries = {
+            "reviews of title": Review.objects.filter(
+                title_id=title_id
+            ).order_by("-pub_date", "-id")[:10],
+            "comments of review": Comment.objects.filter(
+                review_id=review.id, review__title__id=title_id
+            ).order_by("-pub_date", "-id")[:10],
+            "titles by name": Title.objects.order_by("name", "id")[:10],
+        }
+
+        with_indexes = self.measure(queries, options["repeat"])
+        with connection.schema_editor() as editor:
+            for model in (Title, Review, Comment):
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+        without_indexes = self.measure(queries, options["repeat"])
+
+        for name in queries:
+            plan_with, time_with = with_indexes[name]
+            plan_without, time_without = without_indexes[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(
+                f"  без индекса: {time_without * 1000:.3f} мс\n"
+                f"    {plan_without}\n"
+                f"  с индексом:  {time_with * 1000:.3f} мс\n"
+                f"    {plan_with}"
+            )
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, queryset in queries.items():
+            plan = queryset.explain().replace("\n", "\n    ")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = (plan, timings[len(timings) // 2])
+        return results
@@ -1,27 +1,194 @@
 import csv
+import os
+import time
+from itertools import islice
 
 from django.apps import apps
-from django.core.management.base import BaseCommand
-from django.db.utils import IntegrityError
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from reviews.ratings import rebuild_ratings
+from reviews.stats import rebuild_stats
+
+DATA_DIR = os.path.join(settings.BASE_DIR, "static", "data")
+
+# Порядок загрузки учитывает зависимости по внешним ключам.
+DATA_FILES = (
+    ("users.csv", "users.User"),
+    ("category.csv", "reviews.Category"),
+    ("genre.csv", "reviews.Genre"),
+    ("titles.csv", "reviews.Title"),
+    ("genre_title.csv", "reviews.Title_genre"),
+    ("review.csv", "reviews.Review"),
+    ("comments.csv", "reviews.Comment"),
+)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CsvImporter:
+    """Потоково загружает CSV-файл в модель пачками через bulk_create."""
+
+    def __init__(self, model, batch_size):
+        self.model = model
+        self.batch_size = batch_size
+        self.loaded = 0
+        self.skipped = 0
+        self.errors = []
+
+    def get_columns(self, header):
+        """Сопоставляет колонки CSV полям модели.
+
+        Колонка с именем внешнего ключа (``category``, ``author``) или его
+        атрибута (``title_id``) пишется прямо в ``<поле>_id``.
+        """
+        columns = []
+        for name in header:
+            field = None
+            for candidate in self.model._meta.concrete_fields:
+                if name in (candidate.name, candidate.attname):
+                    field = candidate
+                    break
+            if field is None:
+                raise CommandError(
+                    f"В модели {self.model.__name__} нет поля {name}"
+                )
+            columns.append(field)
+        return columns
+
+    def preload_ids(self, columns):
+        """Загружает множества существующих ключей одним запросом на модель."""
+        known_ids = {}
+        for field in columns:
+            if field.is_relation:
+                related = field.related_model
+                known_ids[field.attname] = set(
+                    related._default_manager.values_list("pk", flat=True)
+                )
+        existing = set(
+            self.model._default_manager.values_list("pk", flat=True)
+        )
+        return known_ids, existing
+
+    def build(self, columns, row, known_ids, existing):
+        data = {}
+        for field, value in zip(columns, row):
+            if value == "" and field.null:
+                value = None
+            elif field.is_relation:
+                value = field.target_field.to_python(value)
+                if value not in known_ids[field.attname]:
+                    raise ValidationError(f"{field.name}={value} не найден")
+            else:
+                value = field.to_python(value)
+            data[field.attname] = value
+        instance = self.model(**data)
+        if instance.pk is not None and instance.pk in existing:
+            return None
+        return instance
+
+    def save_batch(self, instances):
+        try:
+            with transaction.atomic():
+                self.model._default_manager.bulk_create(instances)
+            self.loaded += len(instances)
+        except IntegrityError:
+            # Пачка отклонена целиком: ищем виновные строки по одной.
+            for instance in instances:
+                try:
+                    with transaction.atomic():
+                        self.model._default_manager.bulk_create([instance])
+                    self.loaded += 1
+                except IntegrityError as err:
+                    self.errors.append(f"pk={instance.pk}: {err}")
+
+    def load(self, file_path):
+        with open(file_path, "r", encoding="utf-8", newline="") as file:
+            reader = csv.reader(file, delimiter=",")
+            columns = self.get_columns(next(reader))
+            known_ids, existing = self.preload_ids(columns)
+            for rows in batched(reader, self.batch_size):
+                instances = []
+                for row in rows:
+                    try:
+                        instance = self.build(
+                            columns, row, known_ids, existing
+                        )
+                    except ValidationError as err:
+                        self.errors.append(
+                            f'{", ".join(err.messages)}: "{", ".join(row)}"'
+                        )
+                        continue
+                    if instance is None:
+                        self.skipped += 1
+                        continue
+                    existing.add(instance.pk)
+                    instances.append(instance)
+                if instances:
+                    self.save_batch(instances)
 
 
 class Command(BaseCommand):
+    help = (
+        "Загружает CSV-файл в модель или, без аргументов, весь набор "
+        "static/data в порядке зависимостей"
+    )
+
     def add_arguments(self, parser):
-        parser.add_argument("path", type=str, help="путь к файлу CSV")
-        parser.add_argument("model", type=str, help="имя модели")
+        parser.add_argument(
+            "path", type=str, nargs="?", help="путь к файлу CSV"
+        )
+        parser.add_argument("model", type=str, nargs="?", help="имя модели")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="количество строк в одной вставке",
+        )
+        parser.add_argument(
+            "--data-dir",
+            type=str,
+            default=DATA_DIR,
+            help="каталог с CSV-файлами для полной загрузки",
+        )
 
     def handle(self, *args, **options):
-        file_path = options["path"]
-        model = apps.get_model(options["model"])
+        if options["path"] and not options["model"]:
+            raise CommandError("Укажите имя модели для файла CSV")
+        if options["path"]:
+            files = ((options["path"], options["model"]),)
+        else:
+            files = (
+                (os.path.join(options["data_dir"], name), label)
+                for name, label in DATA_FILES
+            )
+        for file_path, label in files:
+            self.load_file(file_path, apps.get_model(label), options)
+        rebuild_ratings()
+        rebuild_stats()
 
-        with open(file_path, "r", encoding="utf-8", newline="") as file:
-            reader = csv.reader(file, delimiter=",")
-            header = reader.__next__()
-            for row in reader:
-                data = {key: value for key, value in zip(header, row)}
-                try:
-                    model.objects.create(**data)
-                    self.stdout.write(self.style.SUCCESS("Successfully"))
-                except IntegrityError as err:
-                    line = ", ".join(row)
-                    self.stdout.write(f'Error! {err}, "{line}"')
+    def load_file(self, file_path, model, options):
+        importer = CsvImporter(model, options["batch_size"])
+        started = time.perf_counter()
+        importer.load(file_path)
+        elapsed = time.perf_counter() - started
+        for error in importer.errors:
+            self.stderr.write(f"Error! {error}")
+        rate = importer.loaded / elapsed if elapsed else importer.loaded
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{model._meta.label}: загружено {importer.loaded}, "
+                f"пропущено {importer.skipped}, "
+                f"ошибок {len(importer.errors)} "
+                f"за {elapsed:.2f} с ({rate:.0f} строк/с)"
+            )
+        )
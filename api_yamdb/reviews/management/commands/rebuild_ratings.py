@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_ratings
+from reviews.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сохранённый рейтинг и статистику произведений "
+        "по отзывам"
+    )
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        rebuild_stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Рейтинг пересчитан для {updated} произведений"
+            )
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 06:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    totals = (
+        Review.objects.filter(score__isnull=False)
+        .order_by()
+        .values("title")
+        .annotate(rating_sum=Sum("score"), rating_count=Count("id"))
+    )
+    for row in totals:
+        Title.objects.filter(pk=row["title"]).update(
+            rating_sum=row["rating_sum"], rating_count=row["rating_count"]
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0013_alter_title_year"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="rating_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество оценок"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating_sum",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Сумма оценок"
+            ),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
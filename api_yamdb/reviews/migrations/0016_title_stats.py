@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0015_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TitleStats",
+            fields=[
+                (
+                    "title",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="reviews.title",
+                    ),
+                ),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("comment_count", models.PositiveIntegerField(default=0)),
+                ("score_1", models.PositiveIntegerField(default=0)),
+                ("score_2", models.PositiveIntegerField(default=0)),
+                ("score_3", models.PositiveIntegerField(default=0)),
+                ("score_4", models.PositiveIntegerField(default=0)),
+                ("score_5", models.PositiveIntegerField(default=0)),
+                ("score_6", models.PositiveIntegerField(default=0)),
+                ("score_7", models.PositiveIntegerField(default=0)),
+                ("score_8", models.PositiveIntegerField(default=0)),
+                ("score_9", models.PositiveIntegerField(default=0)),
+                ("score_10", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Статистика произведения",
+                "verbose_name_plural": "Статистика произведений",
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 3.2 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_ranking(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    TitleRanking = apps.get_model("reviews", "TitleRanking")
+    mean = getattr(settings, "TOP_TITLES_PRIOR_MEAN", 5.5)
+    weight = getattr(settings, "TOP_TITLES_PRIOR_WEIGHT", 5)
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        "title_id", "genre_id"
+    ):
+        genres.setdefault(title_id, []).append(genre_id)
+    rows = []
+    for pk, category_id, year, total, count in Title.objects.values_list(
+        "pk", "category_id", "year", "rating_sum", "rating_count"
+    ):
+        bayesian = None
+        if weight or count:
+            bayesian = (mean * weight + total) / (weight + count)
+        rows.extend(
+            TitleRanking(
+                title_id=pk,
+                genre_id=genre_id,
+                category_id=category_id,
+                year=year,
+                rating_sum=total,
+                rating_count=count,
+                average=total / count if count else None,
+                bayesian=bayesian,
+            )
+            for genre_id in [None] + genres.get(pk, [])
+        )
+    TitleRanking.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(null=True)),
+                ('bayesian', models.FloatField(null=True)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'average', 'rating_count', 'title'], name='ranking_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'bayesian', 'rating_count', 'title'], name='ranking_bayesian_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', 'average', 'rating_count', 'title'], name='ranking_category_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', 'bayesian', 'rating_count', 'title'], name='ranking_category_bayesian_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_title_genre_ranking'),
+        ),
+        migrations.RunPython(fill_ranking, migrations.RunPython.noop),
+    ]
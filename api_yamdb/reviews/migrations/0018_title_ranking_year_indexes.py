@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0017_title_ranking"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="titleranking",
+            index=models.Index(
+                fields=["genre", "year", "average", "rating_count", "title"],
+                name="ranking_year_average_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="titleranking",
+            index=models.Index(
+                fields=["genre", "year", "bayesian", "rating_count", "title"],
+                name="ranking_year_bayesian_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="titleranking",
+            index=models.Index(
+                fields=[
+                    "genre",
+                    "category",
+                    "year",
+                    "average",
+                    "rating_count",
+                    "title",
+                ],
+                name="ranking_cat_year_average_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="titleranking",
+            index=models.Index(
+                fields=[
+                    "genre",
+                    "category",
+                    "year",
+                    "bayesian",
+                    "rating_count",
+                    "title",
+                ],
+                name="ranking_cat_year_bayesian_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-18 09:40
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_stats(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    TitleStats = apps.get_model("reviews", "TitleStats")
+    Review = apps.get_model("reviews", "Review")
+    Comment = apps.get_model("reviews", "Comment")
+    missing = Title.objects.filter(stats__isnull=True)
+    stats = {
+        pk: TitleStats(title_id=pk)
+        for pk in missing.values_list("pk", flat=True)
+    }
+    histogram = (
+        Review.objects.filter(title__in=missing)
+        .order_by()
+        .values_list("title", "score")
+        .annotate(total=Count("id"))
+    )
+    for title_id, score, total in histogram:
+        row = stats[title_id]
+        row.review_count += total
+        if score is not None:
+            setattr(row, f"score_{score}", total)
+    comments = (
+        Comment.objects.filter(review__title__in=missing)
+        .order_by()
+        .values_list("review__title")
+        .annotate(total=Count("id"))
+    )
+    for title_id, total in comments:
+        stats[title_id].comment_count = total
+    TitleStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reviews", "0018_title_ranking_year_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
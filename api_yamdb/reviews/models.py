@@ -33,6 +33,9 @@ class Genre(CategoryGenreBase):
         verbose_name_plural = "Жанры"
 
 
+RATING_COUNTER_FIELDS = ("rating_sum", "rating_count")
+
+
 class Title(models.Model):
     name = models.CharField(verbose_name="Название", max_length=256)
     year = models.PositiveSmallIntegerField(
@@ -53,15 +56,41 @@ class Title(models.Model):
         related_name="titles",
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок", default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок", default=0, editable=False
+    )
 
     class Meta:
         ordering = ("name",)
+        indexes = [models.Index(fields=["name"], name="title_name_idx")]
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Счётчики оценок меняет только UPDATE с F() в reviews.ratings.
+        # Обычное сохранение их не пишет, иначе затёрло бы прибавку от
+        # отзыва, записанного после чтения произведения.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RATING_COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -84,6 +113,11 @@ class Review(models.Model):
                 fields=["author", "title"], name="unique_author_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date"], name="review_title_pub_date_idx"
+            )
+        ]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
 
@@ -99,5 +133,135 @@ class Comment(models.Model):
     pub_date = models.DateTimeField("Pub-date_", auto_now_add=True)
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date"],
+                name="comment_review_pub_date_idx",
+            )
+        ]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+
+
+class TitleStats(models.Model):
+    """Счётчики отзывов и комментариев произведения.
+
+    Обновляются сигналами на каждую запись отзыва или комментария, так
+    что распределение оценок не требует обхода отзывов.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Статистика произведения"
+        verbose_name_plural = "Статистика произведений"
+
+    @property
+    def scores(self):
+        return {
+            score: getattr(self, f"score_{score}") for score in range(1, 11)
+        }
+
+
+class TitleRanking(models.Model):
+    """Строка рейтинга для ``/titles/top/``.
+
+    У произведения есть строка без жанра и по строке на каждый его жанр.
+    В них скопированы категория, год и оценки произведения и хранятся
+    готовые средняя и байесовская оценки, так что лучшие произведения
+    выбираются по индексу без агрегации отзывов и без соединения с
+    жанрами. Обновляется сигналами, см. ``reviews.leaderboard``.
+    """
+
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name="rankings"
+    )
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, null=True, related_name="+"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    year = models.PositiveSmallIntegerField()
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True)
+    bayesian = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "genre"], name="unique_title_genre_ranking"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["genre", "average", "rating_count", "title"],
+                name="ranking_average_idx",
+            ),
+            models.Index(
+                fields=["genre", "bayesian", "rating_count", "title"],
+                name="ranking_bayesian_idx",
+            ),
+            models.Index(
+                fields=[
+                    "genre", "category", "average", "rating_count", "title"
+                ],
+                name="ranking_category_average_idx",
+            ),
+            models.Index(
+                fields=[
+                    "genre", "category", "bayesian", "rating_count", "title"
+                ],
+                name="ranking_category_bayesian_idx",
+            ),
+            models.Index(
+                fields=["genre", "year", "average", "rating_count", "title"],
+                name="ranking_year_average_idx",
+            ),
+            models.Index(
+                fields=["genre", "year", "bayesian", "rating_count", "title"],
+                name="ranking_year_bayesian_idx",
+            ),
+            models.Index(
+                fields=[
+                    "genre",
+                    "category",
+                    "year",
+                    "average",
+                    "rating_count",
+                    "title",
+                ],
+                name="ranking_cat_year_average_idx",
+            ),
+            models.Index(
+                fields=[
+                    "genre",
+                    "category",
+                    "year",
+                    "bayesian",
+                    "rating_count",
+                    "title",
+                ],
+                name="ranking_cat_year_bayesian_idx",
+            ),
+        ]
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Рейтинг произведений"
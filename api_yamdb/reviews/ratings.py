@@ -0,0 +1,51 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .leaderboard import change_ranking, rebuild_ranking
+from .models import Review, Title
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Сдвигает сохранённые сумму и количество оценок произведения.
+
+    Вместе с произведением сдвигается и его строка в рейтинге.
+    """
+    if not (score_delta or count_delta):
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F("rating_sum") + score_delta,
+        rating_count=F("rating_count") + count_delta,
+    )
+    change_ranking(title_id, score_delta, count_delta)
+
+
+def rebuild_ratings(titles=None):
+    """Пересчитывает рейтинг по отзывам одним UPDATE-запросом.
+
+    Строки рейтинга произведений затем собираются заново.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    scores = (
+        Review.objects.filter(title=OuterRef("pk"), score__isnull=False)
+        .order_by()
+        .values("title")
+    )
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(
+                scores.annotate(total=Sum("score")).values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        rating_count=Coalesce(
+            Subquery(
+                scores.annotate(total=Count("id")).values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    )
+    rebuild_ranking(titles)
+    return updated
@@ -0,0 +1,193 @@
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Review, Title
+
+# Поля, по которым ищем, с весами для ранжирования.
+SEARCH_FIELDS = {
+    Title: (("name", 10.0), ("description", 1.0)),
+    Review: (("text", 1.0),),
+}
+
+WORD_RE = re.compile(r"\w+")
+
+
+def get_words(query):
+    return WORD_RE.findall(query or "")
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового движка.
+
+    ``search`` сужает queryset до найденных объектов и упорядочивает их
+    по релевантности. ``update`` и ``remove`` вызываются при сохранении и
+    удалении объектов — движкам вне базы данных они нужны для
+    синхронизации индекса.
+    """
+
+    def search(self, queryset, query, fields=None):
+        raise NotImplementedError
+
+    def update(self, instance):
+        pass
+
+    def remove(self, instance):
+        pass
+
+    def install(self):
+        """Создаёт структуры индекса; вызывается после каждой миграции."""
+
+    def rebuild(self):
+        pass
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Поиск через icontains: работает на любой базе, но без индекса."""
+
+    def search(self, queryset, query, fields=None):
+        words = get_words(query)
+        if not words:
+            return queryset.none()
+        fields = fields or [name for name, _ in SEARCH_FIELDS[queryset.model]]
+        return queryset.filter(
+            reduce(
+                and_,
+                (
+                    reduce(
+                        or_,
+                        (
+                            Q(**{f"{field}__icontains": word})
+                            for field in fields
+                        ),
+                    )
+                    for word in words
+                ),
+            )
+        )
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """Полнотекстовый поиск на SQLite FTS5.
+
+    Индекс — внешние content-таблицы ``<таблица>_fts``, которые держат в
+    актуальном состоянии триггеры, поэтому ``update`` и ``remove`` ничего
+    не делают, а bulk_create и каскадные удаления не требуют отдельной
+    синхронизации. SQLite пересоздаёт таблицу при изменении её схемы и
+    теряет триггеры, поэтому ``install`` вызывается после каждой миграции
+    и восстанавливает недостающее.
+    """
+
+    @staticmethod
+    def fts_table(model):
+        return f"{model._meta.db_table}_fts"
+
+    @staticmethod
+    def match_expression(words, fields):
+        # Каждое слово — отдельная фраза с поиском по префиксу, так что
+        # операторы FTS5 во вводе пользователя не интерпретируются.
+        columns = "{%s}" % " ".join(fields)
+        return " AND ".join(f'{columns} : "{word}"*' for word in words)
+
+    def search(self, queryset, query, fields=None):
+        words = get_words(query)
+        if not words:
+            return queryset.none()
+        model = queryset.model
+        weights = SEARCH_FIELDS[model]
+        fields = fields or [name for name, _ in weights]
+        table = self.fts_table(model)
+        pk = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+        match = self.match_expression(words, fields)
+        bm25 = ", ".join(str(weight) for _, weight in weights)
+        return (
+            queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+                    (match,),
+                )
+            )
+            .annotate(
+                search_rank=RawSQL(
+                    f"SELECT bm25({table}, {bm25}) FROM {table} "
+                    f"WHERE {table} MATCH %s AND rowid = {pk}",
+                    (match,),
+                )
+            )
+            .order_by("search_rank", "pk")
+        )
+
+    def install_statements(self, model):
+        table = model._meta.db_table
+        fts = self.fts_table(model)
+        columns = [name for name, _ in SEARCH_FIELDS[model]]
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{column}" for column in columns)
+        old = ", ".join(f"old.{column}" for column in columns)
+        insert_new = (
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+        )
+        delete_old = (
+            f"INSERT INTO {fts}({fts}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old});"
+        )
+        return {
+            fts: (
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, "
+                f"content='{table}', content_rowid='id')"
+            ),
+            f"{fts}_ai": (
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} "
+                f"BEGIN {insert_new} END"
+            ),
+            f"{fts}_ad": (
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} "
+                f"BEGIN {delete_old} END"
+            ),
+            f"{fts}_au": (
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            ),
+        }
+
+    def install(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type IN ('table', 'trigger')"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            for model in SEARCH_FIELDS:
+                statements = self.install_statements(model)
+                missing = [
+                    sql
+                    for name, sql in statements.items()
+                    if name not in existing
+                ]
+                for sql in missing:
+                    cursor.execute(sql)
+                if missing:
+                    self.rebuild_model(cursor, model)
+
+    def rebuild_model(self, cursor, model):
+        fts = self.fts_table(model)
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for model in SEARCH_FIELDS:
+                self.rebuild_model(cursor, model)
+
+
+def get_search_backend():
+    return import_string(
+        getattr(
+            settings, "SEARCH_BACKEND", "reviews.search.SimpleSearchBackend"
+        )
+    )()
@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title
+from .ratings import rebuild_ratings
+from .stats import rebuild_stats
+
+User = get_user_model()
+
+
+@contextmanager
+def explicit_pub_dates(*models):
+    """Даёт bulk_create записать свои pub_date вместо текущего времени."""
+    fields = [model._meta.get_field("pub_date") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def insert(model, objects, batch_size):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+
+
+def seed_catalog(
+    users=100,
+    titles=100,
+    genres=10,
+    categories=3,
+    reviews_per_title=10,
+    comments_per_review=1,
+    batch_size=5000,
+):
+    """Заполняет базу синтетическим каталогом заданного размера.
+
+    Отзывы на произведение оставляют разные авторы, поэтому
+    ``reviews_per_title`` не может превышать ``users``.
+    """
+    if reviews_per_title > users:
+        raise ValueError("reviews_per_title не может быть больше users")
+    prefix = f"seed{timezone.now():%H%M%S%f}"
+    started = timezone.now() - timedelta(days=365)
+
+    insert(
+        User,
+        (
+            User(
+                username=f"{prefix}_{idx}", email=f"{prefix}_{idx}@yamdb.fake"
+            )
+            for idx in range(users)
+        ),
+        batch_size,
+    )
+    insert(
+        Category,
+        (
+            Category(name=f"Категория {idx}", slug=f"{prefix}-c{idx}")
+            for idx in range(categories)
+        ),
+        batch_size,
+    )
+    insert(
+        Genre,
+        (
+            Genre(name=f"Жанр {idx}", slug=f"{prefix}-g{idx}")
+            for idx in range(genres)
+        ),
+        batch_size,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+    category_ids = list(
+        Category.objects.filter(slug__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+    genre_ids = list(
+        Genre.objects.filter(slug__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+
+    insert(
+        Title,
+        (
+            Title(
+                name=f"{prefix} Произведение {idx}",
+                year=1900 + idx % 120,
+                description=f"Описание произведения {idx}",
+                category_id=category_ids[idx % len(category_ids)],
+            )
+            for idx in range(titles)
+        ),
+        batch_size,
+    )
+    title_ids = list(
+        Title.objects.filter(name__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+    insert(
+        Title.genre.through,
+        (
+            Title.genre.through(
+                title_id=title_id, genre_id=genre_ids[idx % len(genre_ids)]
+            )
+            for idx, title_id in enumerate(title_ids)
+        ),
+        batch_size,
+    )
+
+    with explicit_pub_dates(Review, Comment):
+        insert(
+            Review,
+            (
+                Review(
+                    title_id=title_id,
+                    author_id=user_ids[(idx + offset) % len(user_ids)],
+                    text=f"Отзыв {offset} на произведение {idx}",
+                    score=1 + (idx + offset) % 10,
+                    pub_date=started + timedelta(minutes=idx + offset),
+                )
+                for idx, title_id in enumerate(title_ids)
+                for offset in range(reviews_per_title)
+            ),
+            batch_size,
+        )
+        if comments_per_review:
+            review_ids = list(
+                Review.objects.filter(
+                    title__name__startswith=prefix
+                ).values_list("id", flat=True)
+            )
+            insert(
+                Comment,
+                (
+                    Comment(
+                        review_id=review_id,
+                        author_id=user_ids[(idx + offset) % len(user_ids)],
+                        text=f"Комментарий {offset}",
+                        pub_date=started + timedelta(minutes=idx + offset),
+                    )
+                    for idx, review_id in enumerate(review_ids)
+                    for offset in range(comments_per_review)
+                ),
+                batch_size,
+            )
+    rebuild_ratings(Title.objects.filter(name__startswith=prefix))
+    rebuild_stats(Title.objects.filter(name__startswith=prefix))
+    return title_ids
@@ -0,0 +1,141 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save
+)
+from django.dispatch import receiver
+
+from .leaderboard import rebuild_ranking, sync_ranking
+from .models import Comment, Review, Title, TitleRanking, TitleStats
+from .ratings import change_rating, rebuild_ratings
+from .search import get_search_backend
+from .stats import change_stats, rebuild_stats
+
+UNKNOWN = object()
+
+
+def score_contribution(score):
+    if score is None:
+        return 0, 0
+    return score, 1
+
+
+def move_review(old_title_id, old_score, title_id, score):
+    """Переносит вклад отзыва в рейтинг и статистику произведения."""
+    old_sum, old_count = score_contribution(old_score)
+    new_sum, new_count = score_contribution(score)
+    if old_title_id != title_id:
+        change_rating(old_title_id, -old_sum, -old_count)
+        change_rating(title_id, new_sum, new_count)
+        change_stats(
+            Title.objects.filter(pk=old_title_id),
+            reviews=-1,
+            scores={old_score: -1},
+        )
+        change_stats(
+            Title.objects.filter(pk=title_id), reviews=1, scores={score: 1}
+        )
+        return
+    change_rating(title_id, new_sum - old_sum, new_count - old_count)
+    if old_score != score:
+        change_stats(
+            Title.objects.filter(pk=title_id), scores={old_score: -1, score: 1}
+        )
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    # Отложенные поля (.only/.defer) не читаем, чтобы не делать запрос.
+    instance._loaded_title_id = instance.__dict__.get("title_id", UNKNOWN)
+    instance._loaded_score = instance.__dict__.get("score", UNKNOWN)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_title_id = instance._loaded_title_id
+    old_score = instance._loaded_score
+    instance._loaded_title_id = instance.title_id
+    instance._loaded_score = instance.score
+    if created:
+        change_rating(instance.title_id, *score_contribution(instance.score))
+        change_stats(
+            Title.objects.filter(pk=instance.title_id),
+            reviews=1,
+            scores={instance.score: 1},
+        )
+        return
+    if UNKNOWN in (old_title_id, old_score):
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        rebuild_stats(Title.objects.filter(pk=instance.title_id))
+        return
+    move_review(old_title_id, old_score, instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if UNKNOWN in (instance._loaded_title_id, instance._loaded_score):
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        rebuild_stats(Title.objects.filter(pk=instance.title_id))
+        return
+    change_rating(
+        instance._loaded_title_id,
+        *(-value for value in score_contribution(instance._loaded_score)),
+    )
+    change_stats(
+        Title.objects.filter(pk=instance._loaded_title_id),
+        reviews=-1,
+        scores={instance._loaded_score: -1},
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_on_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_stats(
+            Title.objects.filter(reviews=instance.review_id), comments=1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_on_delete(sender, instance, **kwargs):
+    change_stats(Title.objects.filter(reviews=instance.review_id), comments=-1)
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Title)
+def update_title_ranking(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        sync_ranking(instance, created)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_ranking(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        rebuild_ranking(Title.objects.filter(pk=instance.pk))
+    elif pk_set:
+        rebuild_ranking(Title.objects.filter(pk__in=pk_set))
+    elif action == "post_clear":
+        TitleRanking.objects.filter(genre=instance).delete()
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().update(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Comment, Review, Title, TitleStats
+
+
+def score_field(score):
+    return f"score_{score}"
+
+
+def change_stats(titles, reviews=0, comments=0, scores=None):
+    """Сдвигает счётчики статистики произведений из ``titles``.
+
+    ``scores`` — сдвиги гистограммы по оценкам. Строка статистики
+    создаётся вместе с произведением: сигналом ``post_save`` или в
+    пакетной записи.
+    """
+    deltas = {}
+    if reviews:
+        deltas["review_count"] = F("review_count") + reviews
+    if comments:
+        deltas["comment_count"] = F("comment_count") + comments
+    for score, delta in (scores or {}).items():
+        if score is not None and delta:
+            deltas[score_field(score)] = F(score_field(score)) + delta
+    if deltas:
+        TitleStats.objects.filter(title__in=titles).update(**deltas)
+
+
+def rebuild_stats(titles=None):
+    """Пересчитывает статистику произведений по отзывам и комментариям."""
+    if titles is None:
+        titles = Title.objects.all()
+    stats = {
+        pk: TitleStats(title_id=pk)
+        for pk in titles.values_list("pk", flat=True)
+    }
+    histogram = (
+        Review.objects.filter(title__in=titles)
+        .order_by()
+        .values_list("title", "score")
+        .annotate(total=Count("id"))
+    )
+    for title_id, score, total in histogram:
+        row = stats[title_id]
+        row.review_count += total
+        if score is not None:
+            setattr(row, score_field(score), total)
+    comments = (
+        Comment.objects.filter(review__title__in=titles)
+        .order_by()
+        .values_list("review__title")
+        .annotate(total=Count("id"))
+    )
+    for title_id, total in comments:
+        stats[title_id].comment_count = total
+    with transaction.atomic():
+        TitleStats.objects.filter(title__in=titles).delete()
+        TitleStats.objects.bulk_create(stats.values(), batch_size=1000)
+    return len(stats)
+
+
+def get_stats(title_id):
+    """Статистика произведения или ``None``, если его нет.
+
+    Только чтение: один запрос по первичному ключу.
+    """
+    return TitleStats.objects.filter(title_id=title_id).first()
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from users.outbox import deliver
+
+
+def deliver_in_thread(batch_size):
+    try:
+        return deliver(batch_size)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Отправляет письма из очереди исходящих в несколько потоков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="пауза в секундах, когда очередь пуста",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="выйти, как только очередь опустеет",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                results = list(
+                    pool.map(
+                        deliver_in_thread, [options["batch_size"]] * workers
+                    )
+                )
+                claimed = sum(result[0] for result in results)
+                sent = sum(result[1] for result in results)
+                if claimed:
+                    self.stdout.write(f"Отправлено {sent} из {claimed} писем")
+                    continue
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 
+from .tokens import confirmation_code_generator
 from .validators import validate_username
 
 
@@ -13,6 +18,23 @@ class UserRoles(models.TextChoices):
     USER = "user"
 
 
+# Шлётся после QuerySet.update() и bulk_update() пользователей, которые
+# обходят post_save; pks — первичные ключи изменённых строк.
+users_changed = Signal()
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        pks = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        users_changed.send(sender=self.model, pks=pks)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     username = models.CharField(
         verbose_name="Никнейм",
@@ -46,30 +68,56 @@ class User(AbstractUser):
         verbose_name="Код подтверждения", max_length=100, blank=True, null=True
     )
 
+    objects = UserManager()
+
     class Meta:
         verbose_name = "пользователь"
         verbose_name_plural = "Пользователи"
 
-    def generate_confirmation_code(self):
+    def make_confirmation_code(self):
+        """Выдаёт код подтверждения.
+
+        В режиме ``CONFIRMATION_CODE_STATELESS`` код подписан и ничего не
+        пишет в базу, иначе сохраняется в поле ``confirmation_code``.
+        """
+        if getattr(settings, "CONFIRMATION_CODE_STATELESS", False):
+            return confirmation_code_generator.make_code(self)
         code = default_token_generator.make_token(self)
         self.confirmation_code = code[:15]
-        self.send_confirmation_email(self.confirmation_code)
+        self.save(update_fields=["confirmation_code"])
+        return self.confirmation_code
+
+    def generate_confirmation_code(self):
+        # Код и письмо с ним сохраняются вместе или не сохраняются вовсе.
+        with transaction.atomic(savepoint=False):
+            self.send_confirmation_email(self.make_confirmation_code())
 
     def generate_confirmation_code_no_email(self):
-        code = default_token_generator.make_token(self)
-        self.confirmation_code = code[:15]
+        return self.make_confirmation_code()
 
     def send_confirmation_email(self, code):
-        subject = "Your confirmation code"
-        message = f"Ваш код подтверждения: {code}"
-        from_email = "confirmation@api_yamdb.com"
-        recipient_list = [self.email]
-        send_mail(
-            subject, message, from_email, recipient_list, fail_silently=True
+        """Ставит письмо с кодом в очередь.
+
+        С ``EMAIL_OUTBOX_EAGER`` письмо уходит сразу после фиксации
+        транзакции, в которой его поставили в очередь.
+        """
+        email = OutgoingEmail.objects.create(
+            subject="Your confirmation code",
+            body=f"Ваш код подтверждения: {code}",
+            from_email="confirmation@api_yamdb.com",
+            to=self.email,
         )
+        if getattr(settings, "EMAIL_OUTBOX_EAGER", False):
+            from .outbox import send_batch
+
+            transaction.on_commit(lambda: send_batch([email]))
 
     def check_confirmation_code(self, code):
-        return self.confirmation_code == code
+        if getattr(settings, "CONFIRMATION_CODE_STATELESS", False):
+            return confirmation_code_generator.check_code(self, code)
+        return bool(self.confirmation_code) and constant_time_compare(
+            self.confirmation_code, str(code)
+        )
 
     @property
     def is_user(self):
@@ -92,3 +140,53 @@ class User(AbstractUser):
             or self.role == UserRoles.MODERATOR
         ):
             return True
+
+
+class EmailStatus(models.TextChoices):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку; отправляет команда send_outbox."""
+
+    subject = models.CharField(verbose_name="Тема", max_length=255)
+    body = models.TextField(verbose_name="Текст")
+    from_email = models.CharField(verbose_name="Отправитель", max_length=254)
+    to = models.EmailField(verbose_name="Получатель", max_length=254)
+    status = models.CharField(
+        verbose_name="Статус",
+        choices=EmailStatus.choices,
+        default=EmailStatus.PENDING,
+        max_length=10,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток отправки", default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name="Следующая попытка", default=timezone.now
+    )
+    claim = models.CharField(
+        verbose_name="Метка обработчика", max_length=32, blank=True
+    )
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    created_at = models.DateTimeField(
+        verbose_name="Создано", auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name="Отправлено", null=True, blank=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outgoing_email_due_idx",
+            )
+        ]
+        verbose_name = "исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f"{self.to}: {self.subject}"
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import EmailStatus, OutgoingEmail
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def claim_batch(size):
+    """Забирает до ``size`` писем, которым пора уходить.
+
+    Письма помечаются меткой обработчика и откладываются на время аренды,
+    поэтому параллельные обработчики не берут одно письмо дважды, а письма
+    упавшего обработчика снова станут доступны после её окончания.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=EmailStatus.PENDING, next_attempt_at__lte=now
+    )
+    ids = list(
+        due.order_by("next_attempt_at").values_list("pk", flat=True)[:size]
+    )
+    if not ids:
+        return []
+    claim = uuid4().hex
+    lease = timedelta(seconds=get_setting("EMAIL_OUTBOX_LEASE", 300))
+    due.filter(pk__in=ids).update(claim=claim, next_attempt_at=now + lease)
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def schedule_retry(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= get_setting("EMAIL_OUTBOX_MAX_ATTEMPTS", 5):
+        email.status = EmailStatus.FAILED
+    else:
+        delay = get_setting("EMAIL_OUTBOX_RETRY_DELAY", 60)
+        email.next_attempt_at = timezone.now() + timedelta(
+            seconds=delay * 2 ** (email.attempts - 1)
+        )
+    email.save(
+        update_fields=("attempts", "last_error", "status", "next_attempt_at")
+    )
+
+
+def send_batch(emails):
+    """Отправляет письма через одно соединение с почтовым сервером.
+
+    Возвращает количество отправленных; неудачные письма получают
+    следующую попытку с экспоненциальной задержкой.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            schedule_retry(email, error)
+        return 0
+    sent = []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.to],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                schedule_retry(email, error)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        status=EmailStatus.SENT, sent_at=timezone.now(), last_error=""
+    )
+    return len(sent)
+
+
+def deliver(batch_size=100):
+    """Отправляет одну пачку писем. Возвращает (взято, отправлено)."""
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+    return len(emails), send_batch(emails)
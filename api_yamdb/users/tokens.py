@@ -0,0 +1,44 @@
+import json
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+
+class ConfirmationCodeGenerator:
+    """Подписанные HMAC коды подтверждения с ограниченным сроком жизни.
+
+    Код вида ``<время в base36>-<подпись>`` проверяется без обращения к
+    базе: подпись пересчитывается по данным пользователя и времени выдачи.
+    Поля подписываются списком JSON, а не склейкой строк, иначе у
+    разных пользователей могла бы совпасть подписанная строка.
+    """
+
+    key_salt = "users.tokens.ConfirmationCodeGenerator"
+
+    def make_code(self, user, timestamp=None):
+        if timestamp is None:
+            timestamp = int(time.time())
+        digest = salted_hmac(
+            self.key_salt,
+            json.dumps([user.pk, user.username, user.email, timestamp]),
+            algorithm="sha256",
+        ).hexdigest()[:20]
+        return f"{int_to_base36(timestamp)}-{digest}"
+
+    def check_code(self, user, code):
+        if not isinstance(code, str):
+            return False
+        try:
+            timestamp = base36_to_int(code.split("-", 1)[0])
+        except ValueError:
+            return False
+        timeout = getattr(settings, "CONFIRMATION_CODE_TIMEOUT", 60 * 60 * 24)
+        now = time.time()
+        if timestamp > now or now - timestamp > timeout:
+            return False
+        return constant_time_compare(self.make_code(user, timestamp), code)
+
+
+confirmation_code_generator = ConfirmationCodeGenerator()
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture
+def eager_email_outbox(settings):
+    """Письма уходят сразу после фиксации транзакции, а не командой
+    ``send_outbox``: тестам, которые читают код из ``mail.outbox``."""
+    settings.EMAIL_OUTBOX_EAGER = True
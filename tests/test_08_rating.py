@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, title_id):
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что при создании отзыва сохранённые сумма и '
+            'количество оценок произведения обновляются.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[1]['id']
+        )
+        user_client.patch(review_url, data={'score': 9})
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (14, 2), (
+            'Проверьте, что при изменении оценки в отзыве сохранённая сумма '
+            'оценок произведения пересчитывается.'
+        )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert response.json().get('rating') == 7
+
+        user_client.delete(review_url)
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что при удалении отзыва его оценка исключается из '
+            'рейтинга произведения.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin, user,
+                                        user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('rebuild_ratings')
+
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2)
+        empty_title = self.get_title(titles[1]['id'])
+        assert empty_title.rating is None
+
+    def test_03_title_save_keeps_concurrent_rating(self, admin_client,
+                                                   admin, user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        stale = self.get_title(titles[0]['id'])
+        critic = User.objects.create_user(
+            username='critic', email='critic@yamdb.fake'
+        )
+        Review.objects.create(
+            title=stale, author=critic, text='Отзыв', score=8
+        )
+        stale.name = 'Новое название'
+        stale.save()
+        title = self.get_title(titles[0]['id'])
+        assert title.name == 'Новое название'
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что сохранение произведения не затирает счётчики '
+            'оценок, изменённые отзывом после чтения произведения.'
+        )
@@ -0,0 +1,180 @@
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.serializers import ReviewsSerializer
+from reviews.models import Category, Genre, Review, Title
+
+
+def create_catalog(size):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = []
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.mark.parametrize('size', (1, 10))
+    def test_01_title_list_queries(self, client, django_assert_num_queries,
+                                   size):
+        create_catalog(size)
+        # COUNT для пагинации, страница произведений, жанры страницы.
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == size, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'все созданные произведения.'
+        )
+
+    def test_02_title_detail_queries(self, client,
+                                     django_assert_num_queries):
+        titles = create_catalog(3)
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0].id)
+            )
+        assert len(response.json()['genre']) == 2
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def warm_user_client(self, user, shared_cache):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        # Первый запрос кладёт пользователя в кэш аутентификации: он
+        # работает только с общим для процессов кэшем.
+        client.get('/api/v1/titles/')
+        return client
+
+    def test_03_review_create_queries(self, warm_user_client,
+                                      django_assert_num_queries):
+        title = create_catalog(1)[0]
+        # BEGIN, произведение, INSERT, рейтинг, строка в таблице рейтинга
+        # и статистика произведения: вставка и пересчёты идут одной
+        # транзакцией.
+        with django_assert_num_queries(6):
+            response = warm_user_client.post(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+                data={'text': 'Отзыв', 'score': 5}
+            )
+        assert response.status_code == 201
+
+    def test_04_duplicate_review_rejected_by_constraint(
+        self, warm_user_client, user
+    ):
+        title = create_catalog(1)[0]
+        Review.objects.create(title=title, author=user, text='Был', score=1)
+        response = warm_user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Нельзя оставлять более одного ревью!']
+        }, (
+            'Проверьте, что повторный отзыв отклоняется с ошибкой в '
+            '`non_field_errors`.'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+
+    def test_05_review_read_queries(self, client, user,
+                                    django_assert_num_queries):
+        title = create_catalog(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        # COUNT и страница — без загрузки произведения.
+        with django_assert_num_queries(2):
+            client.get(url)
+        # Отзыв вместе с автором.
+        with django_assert_num_queries(1):
+            client.get(f'{url}{review.id}/')
+
+    def test_06_comment_queries(self, warm_user_client, user,
+                                django_assert_num_queries):
+        title = create_catalog(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        # Отзыв, INSERT и статистика произведения.
+        with django_assert_num_queries(3):
+            response = warm_user_client.post(url, data={'text': 'Да'})
+        assert response.status_code == 201
+        with django_assert_num_queries(2):
+            warm_user_client.get(url)
+
+    def test_07_other_integrity_errors_are_not_masked(
+        self, warm_user_client, monkeypatch
+    ):
+        title = create_catalog(1)[0]
+
+        def broken_save(serializer, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(ReviewsSerializer, 'save', broken_save)
+        with pytest.raises(IntegrityError):
+            warm_user_client.post(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+                data={'text': 'Отзыв', 'score': 5}
+            )
+
+    @pytest.mark.parametrize('path', (
+        'missing_title_reviews',
+        'missing_review_comments',
+        'foreign_review_comments',
+    ))
+    def test_08_missing_parent_gives_404(self, client, user, path):
+        first, second = create_catalog(2)
+        review = Review.objects.create(
+            title=first, author=user, text='Отзыв', score=5
+        )
+        url = {
+            'missing_title_reviews': self.REVIEWS_URL_TEMPLATE.format(
+                title_id=99999
+            ),
+            'missing_review_comments': self.COMMENTS_URL_TEMPLATE.format(
+                title_id=first.id, review_id=99999
+            ),
+            'foreign_review_comments': self.COMMENTS_URL_TEMPLATE.format(
+                title_id=second.id, review_id=review.id
+            ),
+        }[path]
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что список отзывов или комментариев несуществующего '
+            'произведения или отзыва возвращает 404.'
+        )
+
+    def test_09_empty_list_of_existing_parent(self, client, user,
+                                              django_assert_num_queries):
+        title = create_catalog(1)[0]
+        # COUNT без строк и проверка произведения.
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == 200
+        assert response.json()['results'] == []
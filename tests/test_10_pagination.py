@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_reviews(self, django_user_model, count):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            )
+        return title
+
+    def test_01_page_number_is_default(self, client, django_user_model):
+        title = self.create_reviews(django_user_model, 3)
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert response.json()['count'] == 3, (
+            'Проверьте, что без параметра `cursor` используется постраничная '
+            'пагинация с ключом `count`.'
+        )
+
+    def test_02_cursor_walks_all_reviews(self, client, django_user_model):
+        title = self.create_reviews(django_user_model, 25)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id) + '?cursor='
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не возвращает `count`.'
+            )
+            assert not any(
+                'COUNT(' in query['sql'] for query in queries.captured_queries
+            ), 'Курсорная пагинация не должна выполнять COUNT-запрос.'
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert sorted(seen) == sorted(
+            Review.objects.values_list('id', flat=True)
+        ), (
+            'Проверьте, что обход всех страниц по курсору возвращает каждый '
+            'отзыв ровно один раз.'
+        )
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+
+from api.cache import get_stats, get_versions, version_key
+from reviews.models import Category
+from tests.utils import create_categories, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_repeated_get_is_served_from_cache(self, client,
+                                                  admin_client):
+        create_categories(admin_client)
+        first = client.get(self.CATEGORY_URL)
+        second = client.get(self.CATEGORY_URL)
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'отдаётся из кэша.'
+        )
+        assert first.json() == second.json()
+        assert get_stats() == {'hits': 1, 'misses': 1}
+
+        other_page = client.get(self.CATEGORY_URL + '?page=1')
+        assert other_page['X-Cache'] == 'MISS', (
+            'Проверьте, что строка запроса входит в ключ кэша.'
+        )
+
+    def test_02_write_invalidates_cache(self, client, admin_client):
+        create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кэш списка '
+            'категорий.'
+        )
+
+    def test_03_review_invalidates_title_cache(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        admin_client.post(
+            f'{url}reviews/', data={'text': 'Отлично', 'score': 8}
+        )
+        response = client.get(url)
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+
+    def test_04_shared_cache_sees_other_process_writes(
+            self, client, admin_client, shared_cache):
+        create_categories(admin_client)
+        assert client.get(self.CATEGORY_URL)['X-Cache'] == 'MISS'
+        assert client.get(self.CATEGORY_URL)['X-Cache'] == 'HIT'
+        # Другой воркер записал категорию и сдвинул версию в общем кэше.
+        other = FileBasedCache(shared_cache['LOCATION'], {})
+        other.set(version_key(Category), time.time_ns(), None)
+        assert client.get(self.CATEGORY_URL)['X-Cache'] == 'MISS', (
+            'Проверьте, что версии данных хранятся в кэше `default` и '
+            'с общим кэшем запись в одном процессе сбрасывает ответы '
+            'в остальных.'
+        )
+
+    def test_05_local_versions_expire_with_responses(self, settings):
+        settings.API_CACHE_TIMEOUT = 60
+        version = get_versions([Category])
+        assert get_versions([Category]) == version
+        later = time.time() + 61
+        with mock.patch(
+            'django.core.cache.backends.locmem.time.time',
+            return_value=later
+        ):
+            assert get_versions([Category]) != version, (
+                'Проверьте, что в кэше процесса версии данных живут не '
+                'дольше `API_CACHE_TIMEOUT`.'
+            )
+
+    def test_06_shared_versions_do_not_expire(self, settings, shared_cache):
+        settings.API_CACHE_TIMEOUT = 60
+        version = get_versions([Category])
+        with mock.patch(
+            'django.core.cache.backends.filebased.time.time',
+            return_value=time.time() + 61
+        ):
+            assert get_versions([Category]) == version
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_etag_returns_not_modified(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        response = client.get(reviews_url)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{reviews_url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается '
+            'ответ со статусом 304.'
+        )
+
+        admin_client.post(reviews_url, data={'text': 'Отлично', 'score': 8})
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва `ETag` меняется.'
+        )
+        assert response['ETag'] != etag
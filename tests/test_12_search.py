@@ -0,0 +1,59 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12FullTextSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranks_name_over_description(self, client,
+                                                   admin_client):
+        create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Назад в будущее',
+            'year': 1985,
+            'genre': ['comedy'],
+            'category': 'films',
+            'description': 'Терминатор тут ни при чём.'
+        })
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Назад в будущее'
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?q=` ищет по названию и '
+            'описанию и выше ставит совпадения в названии.'
+        )
+        assert self.search(client, 'крепк') == ['Крепкий орешек'], (
+            'Проверьте, что поиск находит слова по префиксу.'
+        )
+        assert self.search(client, '"*)(') == []
+
+    def test_02_index_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'name': 'Чужие'},
+        )
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чужие') == ['Чужие'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        assert self.search(client, 'орешек') == []
+
+    def test_03_review_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        admin_client.post(
+            reviews_url, data={'text': 'Культовый боевик', 'score': 9}
+        )
+        response = client.get(reviews_url, {'q': 'боевик'})
+        assert len(response.json()['results']) == 1
+        response = client.get(reviews_url, {'q': 'мелодрама'})
+        assert response.json()['results'] == []
@@ -0,0 +1,41 @@
+import json
+import logging
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13RequestMetrics:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_server_timing_header(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/reviews/')
+        timing = response['Server-Timing']
+        for metric in ('db;', 'view;', 'serializer;', 'total;'):
+            assert metric in timing, (
+                'Проверьте, что заголовок `Server-Timing` содержит метрику '
+                f'`{metric[:-1]}`.'
+            )
+        assert 'queries"' in timing
+
+    def test_02_slow_request_logs_queries(self, client, admin_client,
+                                          settings, caplog):
+        create_titles(admin_client)
+        settings.API_SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            client.get(self.TITLES_URL)
+        record = caplog.records[-1]
+        assert record.levelno == logging.WARNING, (
+            'Проверьте, что запросы дольше `API_SLOW_REQUEST_MS` '
+            'логируются с уровнем WARNING.'
+        )
+        data = json.loads(record.getMessage())
+        assert data['path'] == self.TITLES_URL
+        assert len(data['sql']) == data['queries'] > 0, (
+            'Проверьте, что для медленного запроса в лог попадает полный '
+            'список SQL-запросов.'
+        )
@@ -0,0 +1,88 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import EmailStatus, OutgoingEmail, User
+from users.outbox import deliver
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def test_01_signup_only_queues_email(self, client):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при регистрации письмо не отправляется внутри '
+            'запроса, а ставится в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == self.SIGNUP_DATA['email']
+        assert email.status == EmailStatus.PENDING
+
+        call_command('send_outbox', '--once', '--workers', '2')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [self.SIGNUP_DATA['email']]
+        email.refresh_from_db()
+        assert email.status == EmailStatus.SENT, (
+            'Проверьте, что команда `send_outbox` отправляет письма из '
+            'очереди и отмечает их отправленными.'
+        )
+
+    def test_02_failed_send_is_retried_with_backoff(self, client, settings):
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_outbox.FailingEmailBackend'
+        )
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+
+        assert deliver() == (1, 0)
+        email = OutgoingEmail.objects.get()
+        assert email.status == EmailStatus.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неудачная отправка откладывается на время '
+            'задержки.'
+        )
+        assert deliver() == (0, 0)
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        deliver()
+        email.refresh_from_db()
+        assert email.status == EmailStatus.FAILED, (
+            'Проверьте, что после `EMAIL_OUTBOX_MAX_ATTEMPTS` неудачных '
+            'попыток письмо помечается как неотправленное.'
+        )
+
+    def test_03_user_and_email_are_saved_together(self, client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise ConnectionError('Очередь недоступна')
+
+        monkeypatch.setattr(OutgoingEmail.objects, 'create', fail)
+        with pytest.raises(ConnectionError):
+            client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert not User.objects.filter(
+            username=self.SIGNUP_DATA['username']
+        ).exists(), (
+            'Проверьте, что пользователь и письмо с кодом сохраняются в '
+            'одной транзакции.'
+        )
+
+    def test_04_eager_email_is_sent_after_commit(self, client,
+                                                 eager_email_outbox):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert len(mail.outbox) == 1
+        assert OutgoingEmail.objects.get().status == EmailStatus.SENT, (
+            'Проверьте, что с `EMAIL_OUTBOX_EAGER` письмо отправляется '
+            'сразу и отмечается отправленным.'
+        )
@@ -0,0 +1,84 @@
+import time
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from users.tokens import confirmation_code_generator
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('eager_email_outbox')
+class Test15StatelessConfirmationCode:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def get_code(self, client):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        return mail.outbox[-1].body.split(': ')[-1]
+
+    def obtain_token(self, client, code):
+        return client.post(
+            self.URL_TOKEN,
+            data={
+                'username': self.SIGNUP_DATA['username'],
+                'confirmation_code': code,
+            }
+        )
+
+    def test_01_code_from_email_gives_token(self, client):
+        code = self.get_code(client)
+        response = self.obtain_token(client, code)
+        assert response.status_code == 200
+        assert 'token' in response.json()
+
+    def test_02_repeated_signup_does_not_update_user(self, client):
+        self.get_code(client)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == 200
+        assert not [
+            query for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "users_user"')
+        ], (
+            'Проверьте, что повторная регистрация не изменяет пользователя '
+            'в базе данных.'
+        )
+
+    def test_03_tampered_code_is_rejected(self, client):
+        code = self.get_code(client)
+        tampered = code[:-1] + ('0' if code[-1] != '0' else '1')
+        assert self.obtain_token(client, tampered).status_code == 400
+
+    def test_04_expired_code_is_rejected(self, client, settings):
+        settings.CONFIRMATION_CODE_TIMEOUT = 60
+        code = self.get_code(client)
+        with mock.patch('users.tokens.time.time', return_value=time.time() + 61):
+            response = self.obtain_token(client, code)
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
+
+    def test_05_code_is_bound_to_its_user(self):
+        owner = User(pk=57, username='bob', email='xv@x.com')
+        attacker = User(pk=5, username='7bobx', email='v@x.com')
+        code = confirmation_code_generator.make_code(owner)
+        assert confirmation_code_generator.check_code(owner, code)
+        assert not confirmation_code_generator.check_code(attacker, code), (
+            'Проверьте, что код одного пользователя не подходит другому, '
+            'даже если склейка их полей совпадает.'
+        )
+
+    def test_06_code_from_the_future_is_rejected(self):
+        user = User(pk=1, username='bob', email='bob@yamdb.fake')
+        code = confirmation_code_generator.make_code(
+            user, int(time.time()) + 3600
+        )
+        assert not confirmation_code_generator.check_code(user, code), (
+            'Проверьте, что код с временем выдачи в будущем не принимается.'
+        )
@@ -0,0 +1,81 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16CachedAuthentication:
+
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_repeated_requests_skip_user_query(self, admin, shared_cache,
+                                                  django_assert_num_queries):
+        client = get_client(admin)
+        client.get(self.USERS_URL)
+        # COUNT для пагинации и страница пользователей.
+        with django_assert_num_queries(2):
+            response = client.get(self.USERS_URL)
+        assert response.status_code == 200, (
+            'Проверьте, что повторный запрос берёт пользователя из кэша, '
+            'а не из базы данных.'
+        )
+
+    def test_02_role_change_is_seen_immediately(self, admin, user,
+                                                shared_cache):
+        user_client = get_client(user)
+        assert user_client.get(self.USERS_URL).status_code == 403
+
+        response = get_client(admin).patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get(self.USERS_URL).status_code == 200, (
+            'Проверьте, что изменение роли через `/api/v1/users/` сбрасывает '
+            'закэшированного пользователя.'
+        )
+
+    def test_03_deleted_user_is_rejected(self, admin, user, shared_cache):
+        user_client = get_client(user)
+        assert user_client.get(f'{self.USERS_URL}me/').status_code == 200
+
+        get_client(admin).delete(f'{self.USERS_URL}{user.username}/')
+        assert user_client.get(f'{self.USERS_URL}me/').status_code == 401
+
+    def test_04_queryset_update_is_seen_immediately(self, user,
+                                                    shared_cache):
+        user_client = get_client(user)
+        assert user_client.get(self.USERS_URL).status_code == 403
+
+        User.objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.get(self.USERS_URL).status_code == 200, (
+            'Проверьте, что `QuerySet.update()` пользователей сбрасывает '
+            'закэшированного пользователя.'
+        )
+        user.role = 'user'
+        User.objects.bulk_update([user], ['role'])
+        assert user_client.get(self.USERS_URL).status_code == 403, (
+            'Проверьте, что `bulk_update()` пользователей сбрасывает '
+            'закэшированного пользователя.'
+        )
+
+    def test_05_local_cache_reads_user_from_db(self, admin,
+                                               django_assert_num_queries):
+        client = get_client(admin)
+        client.get(self.USERS_URL)
+        # Пользователь, COUNT для пагинации и страница пользователей.
+        with django_assert_num_queries(3):
+            response = client.get(self.USERS_URL)
+        assert response.status_code == 200, (
+            'Проверьте, что с кэшем в памяти процесса пользователь читается '
+            'из базы: другие процессы не узнают о смене его роли.'
+        )
@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17BulkWrite:
+
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+    GENRES_BULK_URL = '/api/v1/genres/bulk/'
+
+    @pytest.fixture
+    def catalog(self):
+        Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.create(name='Ужасы', slug='horror')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def make_items(self, size):
+        return [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'category': 'films',
+                'genre': ['horror', 'comedy'],
+            }
+            for idx in range(size)
+        ]
+
+    def test_01_titles_created_with_genres(self, admin_client, catalog):
+        response = admin_client.post(
+            self.TITLES_BULK_URL, data=self.make_items(3), format='json'
+        )
+        assert response.status_code == 200
+        created = response.json()['created']
+        assert len(created) == 3
+        for title in Title.objects.filter(id__in=created):
+            assert title.category.slug == 'films'
+            assert set(title.genre.values_list('slug', flat=True)) == {
+                'horror', 'comedy'
+            }
+
+    def test_02_query_count_does_not_grow(self, admin_client, catalog):
+        admin_client.post(
+            self.TITLES_BULK_URL, data=self.make_items(1), format='json'
+        )
+        counts = []
+        for size in (1, 50):
+            with CaptureQueriesContext(connection) as captured:
+                admin_client.post(
+                    self.TITLES_BULK_URL,
+                    data=self.make_items(size),
+                    format='json'
+                )
+            counts.append(len(captured.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов к базе при пакетной записи не '
+            'зависит от размера пакета.'
+        )
+
+    def test_03_item_errors_do_not_abort_batch(self, admin_client, catalog):
+        title = Title.objects.create(name='Старое', year=1990)
+        items = self.make_items(1) + [
+            {'name': 'Без жанра', 'year': 2000, 'category': 'films'},
+            {
+                'name': 'Неизвестный жанр',
+                'year': 2000,
+                'category': 'films',
+                'genre': ['jazz'],
+            },
+            {'id': title.id, 'name': 'Новое', 'genre': ['horror']},
+        ]
+        response = admin_client.post(
+            self.TITLES_BULK_URL, data=items, format='json'
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['created']) == 1
+        assert data['updated'] == [title.id]
+        assert [error['index'] for error in data['errors']] == [1, 2]
+        assert 'genre' in data['errors'][0]['errors']
+        title.refresh_from_db()
+        assert title.name == 'Новое'
+        assert list(title.genre.values_list('slug', flat=True)) == ['horror']
+
+    def test_04_genres_bulk_create(self, admin_client, catalog):
+        response = admin_client.post(
+            self.GENRES_BULK_URL,
+            data=[
+                {'name': 'Джаз', 'slug': 'jazz'},
+                {'name': 'Ужасы', 'slug': 'horror'},
+                {'name': 'Джаз', 'slug': 'jazz'},
+            ],
+            format='json'
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data['created'] == ['jazz']
+        assert [error['index'] for error in data['errors']] == [1, 2]
+        assert Genre.objects.filter(slug='jazz').exists()
+
+    def test_05_bulk_requires_admin(self, user_client, catalog):
+        response = user_client.post(
+            self.TITLES_BULK_URL, data=self.make_items(1), format='json'
+        )
+        assert response.status_code == 403
@@ -0,0 +1,90 @@
+import pytest
+
+from reviews.models import Category, Comment, Review, Title, TitleStats
+from reviews.stats import rebuild_stats
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleStats:
+
+    STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        return Title.objects.create(
+            name='Фильм', year=2000, category=category
+        )
+
+    def get_stats(self, client, title):
+        response = client.get(
+            self.STATS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_01_stats_follow_review_and_comment_writes(
+        self, client, title, admin, user, moderator
+    ):
+        # Строка статистики создаётся с произведением, дальше — инкременты.
+        assert self.get_stats(client, title)['review_count'] == 0
+
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=7
+        )
+        Review.objects.create(title=title, author=user, text='Отзыв', score=3)
+        Comment.objects.create(review=review, author=moderator, text='Да')
+        stats = self.get_stats(client, title)
+        assert stats['review_count'] == 2
+        assert stats['comment_count'] == 1
+        assert stats['scores']['7'] == 1
+        assert stats['scores']['3'] == 1
+
+        review.score = 10
+        review.save()
+        stats = self.get_stats(client, title)
+        assert stats['scores']['7'] == 0
+        assert stats['scores']['10'] == 1
+
+        review.delete()
+        stats = self.get_stats(client, title)
+        assert stats['review_count'] == 1
+        assert stats['comment_count'] == 0
+        assert stats['scores']['10'] == 0
+
+    def test_02_incremental_stats_match_rebuild(self, client, title, admin,
+                                                user):
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Нет')
+        incremental = self.get_stats(client, title)
+        rebuild_stats()
+        assert self.get_stats(client, title) == incremental
+
+    def test_03_stats_answer_in_one_query(self, client, title,
+                                          django_assert_num_queries):
+        with django_assert_num_queries(1):
+            self.get_stats(client, title)
+
+    def test_04_missing_title(self, client):
+        response = client.get(self.STATS_URL_TEMPLATE.format(title_id=404))
+        assert response.status_code == 404
+
+    def test_05_titles_are_created_with_stats(self, admin_client, title):
+        assert TitleStats.objects.filter(title=title).exists(), (
+            'Проверьте, что строка статистики создаётся вместе с '
+            'произведением.'
+        )
+        response = admin_client.post(
+            '/api/v1/titles/bulk/',
+            [{'name': 'Пакет', 'year': 2000, 'category': 'films',
+              'genre': []}],
+            format='json'
+        )
+        assert response.status_code == 200, response.json()
+        created = response.json()['created']
+        assert TitleStats.objects.filter(title__in=created).count() == 1, (
+            'Проверьте, что пакетная запись создаёт строки статистики.'
+        )
+
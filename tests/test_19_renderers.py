@@ -0,0 +1,52 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, MessagePackRenderer
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Renderers:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_same_output_as_json_renderer(self):
+        data = {
+            'name': 'Произведение\u2028',
+            'rating': None,
+            'score': 7.5,
+            'price': Decimal('1.50'),
+            'pub_date': datetime.datetime(
+                2020, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc
+            ),
+            'genre': [{'slug': 'horror'}],
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_02_indent_falls_back_to_json_renderer(self):
+        data = {'id': 1, 'name': 'Фильм'}
+        accepted = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, accepted) == (
+            JSONRenderer().render(data, accepted)
+        )
+
+    def test_03_api_responds_with_json(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Title.objects.create(name='Фильм', year=2000, category=category)
+        response = client.get(self.TITLES_URL)
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['results'][0]['name'] == 'Фильм'
+
+    def test_04_msgpack_negotiation(self, client):
+        msgpack = pytest.importorskip('msgpack')
+        category = Category.objects.create(name='Фильм', slug='films')
+        Title.objects.create(name='Фильм', year=2000, category=category)
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT=MessagePackRenderer.media_type
+        )
+        assert response['Content-Type'] == MessagePackRenderer.media_type
+        data = msgpack.unpackb(response.content)
+        assert data['results'][0]['name'] == 'Фильм'
@@ -0,0 +1,70 @@
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(admin, user, moderator):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = [
+        Title.objects.create(
+            name='Без категории', year=1999, description='Описание'
+        ),
+        Title.objects.create(name='Фильм', year=2000, category=category),
+    ]
+    titles[1].genre.set(genres)
+    for author, score in ((admin, 7), (user, 4), (moderator, None)):
+        review = Review.objects.create(
+            title=titles[1], author=author, text='Отзыв', score=score
+        )
+        Comment.objects.create(review=review, author=user, text='Да')
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20FlatListSerializers:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_urls(self, titles):
+        title = titles[1]
+        review = title.reviews.first()
+        reviews_url = f'{self.TITLES_URL}{title.id}/reviews/'
+        return (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}?cursor=',
+            f'{self.TITLES_URL}?genre=horror',
+            f'{self.TITLES_URL}?q=фильм',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{review.id}/comments/',
+        )
+
+    def test_01_same_output_as_model_serializers(self, client, settings,
+                                                 catalog):
+        for url in self.get_urls(catalog):
+            # Кэш ответов различает версии данных, а не настройки.
+            settings.API_FLAT_LIST_SERIALIZERS = True
+            cache.clear()
+            flat = client.get(url)
+            settings.API_FLAT_LIST_SERIALIZERS = False
+            cache.clear()
+            full = client.get(url)
+            assert flat.status_code == full.status_code == 200
+            assert flat.json() == full.json(), (
+                f'Проверьте, что быстрый сериализатор списка `{url}` '
+                'возвращает тот же JSON, что и обычный.'
+            )
+
+    def test_02_review_list_has_no_author_queries(
+        self, client, catalog, django_assert_num_queries
+    ):
+        title = catalog[1]
+        # COUNT и страница отзывов с авторами.
+        with django_assert_num_queries(2):
+            client.get(f'{self.TITLES_URL}{title.id}/reviews/')
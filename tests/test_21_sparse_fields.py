@@ -0,0 +1,70 @@
+import pytest
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def title(admin):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(
+        name='Фильм', year=2000, category=category, description='Длинно'
+    )
+    title.genre.set([Genre.objects.create(name='Ужасы', slug='horror')])
+    Review.objects.create(title=title, author=admin, text='Отзыв', score=8)
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_01_title_list_fields(self, client, settings, title, flat):
+        settings.API_FLAT_LIST_SERIALIZERS = flat
+        response = client.get(f'{self.TITLES_URL}?fields=id,name,rating')
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'id': title.id, 'name': 'Фильм', 'rating': 8}
+        ]
+
+    def test_02_title_list_skips_genre_query(self, client, title,
+                                             django_assert_num_queries):
+        # COUNT и страница — без запроса жанров.
+        with django_assert_num_queries(2) as captured:
+            client.get(f'{self.TITLES_URL}?fields=id,name')
+        page_sql = captured.captured_queries[-1]['sql']
+        assert 'description' not in page_sql
+        assert 'reviews_category' not in page_sql, (
+            'Проверьте, что без поля `category` запрос не соединяется '
+            'с таблицей категорий.'
+        )
+
+    def test_03_title_detail_omit(self, client, title,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.get(
+                f'{self.TITLES_URL}{title.id}/?omit=genre,description'
+            )
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'category'
+        }
+
+    def test_04_review_list_fields(self, client, title):
+        response = client.get(
+            f'{self.TITLES_URL}{title.id}/reviews/?fields=id,score&cursor='
+        )
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'id': title.reviews.get().id, 'score': 8}
+        ]
+
+    def test_05_users_fields(self, admin_client, admin):
+        response = admin_client.get('/api/v1/users/?fields=username,role')
+        assert response.json()['results'] == [
+            {'username': admin.username, 'role': 'admin'}
+        ]
+
+    def test_06_unknown_field(self, client, title):
+        response = client.get(f'{self.TITLES_URL}?fields=id,secret')
+        assert response.status_code == 400
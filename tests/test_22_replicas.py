@@ -0,0 +1,108 @@
+import sqlite3
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, connections
+
+from api import db_router
+from reviews.models import Category, Review, Title
+
+
+@pytest.fixture
+def replica(tmp_path, settings, monkeypatch):
+    """Копия тестовой базы в отдельном файле SQLite в роли реплики."""
+    path = tmp_path / 'replica.sqlite3'
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+    aliases = {'replica': str(path), 'broken': str(tmp_path / 'no' / 'db')}
+    for alias, name in aliases.items():
+        connections.databases[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': name
+        }
+    monkeypatch.setattr(db_router, '_health', {})
+    settings.DATABASE_REPLICAS = ['replica']
+    yield
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.databases[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ReplicaRouting:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Фильм', slug='films')
+
+    @pytest.fixture
+    def title(self, category):
+        return Title.objects.create(name='Фильм', year=2000)
+
+    def get_names(self, client):
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == 200
+        return {title['name'] for title in response.json()['results']}
+
+    def test_01_reads_go_to_replica(self, client, admin, title, replica):
+        Review.objects.create(title=title, author=admin, text='Да', score=5)
+        response = client.get(f'{self.TITLES_URL}{title.pk}/stats/')
+        assert response.json()['review_count'] == 0, (
+            'Проверьте, что GET-запросы читают из реплики.'
+        )
+
+    def test_02_writer_reads_own_writes(self, client, admin_client,
+                                        category, replica):
+        Title.objects.create(name='Фильм', year=2000)
+        response = admin_client.post(
+            self.TITLES_URL,
+            data={'name': 'Новый', 'year': 2000, 'category': 'films',
+                  'genre': []}
+        )
+        assert response.status_code == 201, response.json()
+        assert self.get_names(admin_client) == {'Фильм', 'Новый'}, (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+        cache.clear()
+        assert self.get_names(client) == {'Фильм', 'Новый'}
+
+    def test_03_unhealthy_replica_falls_back_to_primary(
+        self, client, category, replica, settings
+    ):
+        settings.DATABASE_REPLICAS = ['broken']
+        Title.objects.create(name='Фильм', year=2000)
+        assert self.get_names(client) == {'Фильм'}
+
+    def test_04_management_code_uses_primary(self, category, replica):
+        Title.objects.create(name='Фильм', year=2000)
+        assert Title.objects.filter(name='Фильм').exists()
+
+    def test_05_lagging_replica_is_not_cached(self, client, category,
+                                              replica):
+        assert self.get_names(client) == set()
+        # Запись сдвигает версию, а реплика её ещё не получила.
+        Title.objects.create(name='Фильм', year=2000)
+        response = client.get(self.TITLES_URL)
+        names = {title['name'] for title in response.json()['results']}
+        assert names == {'Фильм'}, (
+            'Проверьте, что ответ под новой версией и ETag читается из '
+            'основной базы, а не из отстающей реплики.'
+        )
+        cached = client.get(self.TITLES_URL)
+        assert cached['X-Cache'] == 'HIT'
+        assert cached['ETag'] == response['ETag']
+        assert cached.json() == response.json()
+
+    def test_06_old_version_is_read_from_replica(self, client, category,
+                                                 replica, settings):
+        # Версии старше DATABASE_REPLICA_PIN_SECONDS реплики уже догнали.
+        settings.DATABASE_REPLICA_PIN_SECONDS = 0
+        Title.objects.create(name='Фильм', year=2000)
+        assert self.get_names(client) == set(), (
+            'Проверьте, что списки по давно не менявшейся версии данных '
+            'читаются из реплики.'
+        )
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.db import connections, transaction
+
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    connections.databases['file'] = {
+        'ENGINE': 'api.sqlite_backend',
+        'NAME': str(tmp_path / 'db.sqlite3'),
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+    yield connections['file']
+    connections['file'].close()
+    del connections['file']
+    del connections.databases['file']
+
+
+class Test23SqliteTuning:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_pragmas_applied_to_new_connections(self, file_connection):
+        with file_connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что новые соединения с SQLite переводятся в '
+                'режим WAL.'
+            )
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_atomic_takes_write_lock_at_begin(self, file_connection):
+        with file_connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        other = sqlite3.connect(
+            file_connection.settings_dict['NAME'], timeout=0
+        )
+        try:
+            with transaction.atomic(using='file'):
+                with file_connection.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM item')
+                with pytest.raises(sqlite3.OperationalError, match='locked'):
+                    other.execute('BEGIN IMMEDIATE')
+        finally:
+            other.close()
+
+    def test_03_stress_command_reports_both_profiles(self):
+        result = subprocess.run(
+            [
+                sys.executable, 'manage.py', 'stress_sqlite',
+                '--writers', '2', '--seconds', '0.2', '--titles', '20',
+            ],
+            cwd=MANAGE_PATH,
+            env=dict(os.environ, PYTHONPATH=MANAGE_PATH),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr[-2000:]
+        lines = result.stdout.splitlines()
+        assert [line.split()[0] for line in lines[1:]] == ['stock', 'tuned']
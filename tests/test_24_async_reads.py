@@ -0,0 +1,157 @@
+import asyncio
+from types import ModuleType
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import include, path, resolve
+
+from api.urls import get_api_urls
+from api.views import TitleViewSet
+from reviews.models import Category, Genre, Review, Title
+
+
+def use_async_reads(settings):
+    """Маршруты API, как под ASGI: с асинхронными обработчиками чтения."""
+    urlconf = ModuleType('async_urls')
+    urlconf.urlpatterns = [path('api/v1/', include(get_api_urls(True)))]
+    settings.ROOT_URLCONF = urlconf
+
+
+@pytest.fixture
+def async_reads(settings):
+    use_async_reads(settings)
+
+
+@pytest.fixture
+def catalog(admin, user):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Ужасы', slug='horror')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.set([genre])
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+    return title, review
+
+
+def asgi_get(url, **headers):
+    async def get():
+        return await AsyncClient().get(url, **headers)
+
+    return async_to_sync(get)()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AsyncReads:
+
+    def get_urls(self, title, review):
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?genre=horror&fields=id,name',
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{review.id}/',
+        )
+
+    def test_01_read_routes_are_async(self, catalog, async_reads):
+        title, review = catalog
+        for url in self.get_urls(title, review):
+            func = resolve(url.split('?')[0]).func
+            assert asyncio.iscoroutinefunction(func), (
+                f'Проверьте, что `{url}` обслуживает асинхронный view.'
+            )
+        comments_url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        )
+        assert not asyncio.iscoroutinefunction(resolve(comments_url).func)
+
+    def test_02_wsgi_uses_sync_views(self, catalog):
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/titles/').func
+        ), (
+            'Проверьте, что асинхронные обработчики по умолчанию выключены '
+            'и их включает только api_yamdb/asgi.py.'
+        )
+
+    def test_03_same_output_as_sync_views(self, client, user_client,
+                                          catalog, settings):
+        urls = self.get_urls(*catalog)
+        expected = []
+        for url in urls:
+            cache.clear()
+            expected.append(user_client.get(url))
+        use_async_reads(settings)
+        for url, sync in zip(urls, expected):
+            cache.clear()
+            for response in (client.get(url), user_client.get(url)):
+                assert response.status_code == sync.status_code == 200
+                assert response.json() == sync.json(), (
+                    f'Проверьте, что асинхронный `{url}` отдаёт то же, что '
+                    'и обычный view.'
+                )
+                assert response['Content-Type'] == sync['Content-Type']
+                assert response['Allow'] == sync['Allow']
+
+    def test_04_errors_are_answered_without_second_read(
+            self, client, admin_client, catalog, async_reads,
+            django_assert_num_queries):
+        assert client.get('/api/v1/titles/?year=abc').status_code == 400
+        assert client.get('/api/v1/titles/?page=99').status_code == 404
+        # Одна выборка: ошибку отдаёт сам viewset, без повторного чтения.
+        with django_assert_num_queries(1):
+            assert client.get('/api/v1/titles/0/').status_code == 404
+        assert client.get(
+            '/api/v1/titles/', HTTP_AUTHORIZATION='Bearer invalid'
+        ).status_code == 401
+        assert client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        ).status_code == 401, (
+            'Проверьте, что асинхронный обработчик проверяет права доступа.'
+        )
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201
+        assert client.get('/api/v1/titles/', HTTP_ACCEPT='text/html')[
+            'Content-Type'
+        ].startswith('text/html')
+
+    def test_05_asgi_cache_hit_skips_database(self, catalog, async_reads):
+        url = '/api/v1/titles/'
+        first = asgi_get(url)
+        second = asgi_get(url)
+        assert first.status_code == second.status_code == 200
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert '"0 queries"' not in first['Server-Timing']
+        assert '"0 queries"' in second['Server-Timing'], (
+            'Проверьте, что под ASGI ответ из кэша обходится без базы.'
+        )
+        not_modified = asgi_get(url, **{'If-None-Match': second['ETag']})
+        assert not_modified.status_code == 304
+
+    def test_06_cookies_are_kept(self, catalog, async_reads, monkeypatch):
+        finalize_response = TitleViewSet.finalize_response
+
+        def finalize_with_cookie(view, request, response, *args, **kwargs):
+            response = finalize_response(
+                view, request, response, *args, **kwargs
+            )
+            response.set_cookie('seen', '1')
+            return response
+
+        monkeypatch.setattr(
+            TitleViewSet, 'finalize_response', finalize_with_cookie
+        )
+        response = asgi_get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.cookies['seen'].value == '1', (
+            'Проверьте, что асинхронный обработчик чтения сохраняет cookies '
+            'ответа.'
+        )
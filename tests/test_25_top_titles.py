@@ -0,0 +1,192 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.leaderboard import rebuild_ranking
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from users.models import User
+
+
+def rate(title, *scores):
+    for idx, score in enumerate(scores):
+        author, _ = User.objects.get_or_create(
+            username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score
+        )
+
+
+@pytest.fixture
+def catalog():
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книга', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        'one_perfect': Title.objects.create(
+            name='Одна десятка', year=2000, category=films
+        ),
+        'solid': Title.objects.create(
+            name='Крепкий', year=2000, category=films
+        ),
+        'weak': Title.objects.create(name='Слабый', year=1990, category=films),
+        'book': Title.objects.create(name='Книга', year=2000, category=books),
+    }
+    titles['solid'].genre.set([drama])
+    titles['book'].genre.set([drama])
+    rate(titles['one_perfect'], 10)
+    rate(titles['solid'], 9, 9, 9, 8, 9)
+    rate(titles['weak'], 3, 4, 2)
+    rate(titles['book'], 7, 8, 7)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TopTitles:
+
+    URL = '/api/v1/titles/top/'
+
+    @staticmethod
+    def get_rows():
+        return list(
+            TitleRanking.objects.order_by('title', 'genre').values(
+                'title', 'genre', 'category', 'year', 'rating_sum',
+                'rating_count', 'average', 'bayesian'
+            )
+        )
+
+    def get_names(self, client, query=''):
+        response = client.get(f'{self.URL}{query}')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET `{self.URL}{query}` возвращает 200.'
+        )
+        return [item['name'] for item in response.json()]
+
+    def test_01_threshold_and_average_order(self, client, catalog):
+        assert self.get_names(client) == ['Крепкий', 'Книга', 'Слабый'], (
+            'Проверьте, что без параметров в рейтинг попадают произведения '
+            'хотя бы с `TOP_TITLES_MIN_REVIEWS` оценками, по убыванию '
+            'средней оценки.'
+        )
+        assert self.get_names(client, '?min_reviews=1')[0] == 'Одна десятка'
+        item = client.get(self.URL).json()[0]
+        assert item['score'] == 8.8
+        assert item['rating'] == 8
+        assert item['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert item['category'] == {'name': 'Фильм', 'slug': 'films'}
+
+    def test_02_bayesian_order(self, client, catalog):
+        names = self.get_names(client, '?min_reviews=1&order=bayesian')
+        assert names.index('Крепкий') < names.index('Одна десятка'), (
+            'Проверьте, что байесовская оценка ставит произведение с одной '
+            'высокой оценкой ниже произведения с многими.'
+        )
+
+    def test_03_filters(self, client, catalog):
+        assert self.get_names(client, '?category=books') == ['Книга']
+        assert self.get_names(client, '?genre=drama') == ['Крепкий', 'Книга']
+        assert self.get_names(client, '?year=1990') == ['Слабый']
+        assert self.get_names(
+            client, '?category=films&genre=drama&year=2000'
+        ) == ['Крепкий']
+        for query in ('?order=median', '?limit=0', '?limit=1000',
+                      '?min_reviews=0', '?year=abc'):
+            assert client.get(f'{self.URL}{query}').status_code == 400
+
+    def test_04_incremental_refresh(self, client, admin_client, catalog):
+        weak = catalog['weak']
+        review = weak.reviews.first()
+        response = admin_client.patch(
+            f'/api/v1/titles/{weak.id}/reviews/{review.id}/',
+            data={'score': 10},
+        )
+        assert response.status_code == 200
+        scores = {
+            item['name']: item['score'] for item in client.get(self.URL).json()
+        }
+        assert scores['Слабый'] == 5.33, (
+            'Проверьте, что изменение отзыва сразу обновляет рейтинг.'
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{weak.id}/',
+            data={'category': 'books', 'genre': ['drama']},
+            format='json',
+        )
+        assert response.status_code == 200
+        assert self.get_names(client, '?category=books') == [
+            'Книга', 'Слабый'
+        ]
+        assert self.get_names(client, '?genre=drama') == [
+            'Крепкий', 'Книга', 'Слабый'
+        ], 'Проверьте, что смена жанров произведения обновляет рейтинг.'
+        catalog['solid'].reviews.first().delete()
+        Review.objects.create(
+            title=catalog['book'],
+            author=User.objects.get(username='critic3'),
+            text='Отзыв',
+            score=None,
+        )
+        incremental = self.get_rows()
+        rebuild_ranking()
+        assert incremental == self.get_rows(), (
+            'Проверьте, что инкрементальное обновление совпадает с '
+            'пересчётом.'
+        )
+
+    def test_05_constant_queries(self, client, catalog,
+                                 django_assert_num_queries):
+        for idx in range(30):
+            rate(
+                Title.objects.create(name=f'Новинка {idx}', year=2001),
+                7, 7, 7,
+            )
+        cache.clear()
+        with django_assert_num_queries(3):
+            names = self.get_names(client, '?limit=5')
+        assert len(names) == 5
+
+    def test_06_bulk_titles_are_ranked(self, admin_client, catalog):
+        response = admin_client.post(
+            '/api/v1/titles/bulk/',
+            data=[{'name': 'Пакетный', 'year': 2005, 'category': 'films',
+                   'genre': ['drama']}],
+            format='json',
+        )
+        title_id = response.json()['created'][0]
+        assert TitleRanking.objects.filter(title_id=title_id).exists(), (
+            'Проверьте, что произведения из пакетной записи попадают в '
+            'таблицу рейтинга.'
+        )
+
+    @pytest.mark.parametrize('query', (
+        '', 'order=bayesian', 'year=2000', 'order=bayesian&year=2000',
+        'genre=drama&year=2000', 'category=films&year=2000',
+        'category=films&genre=drama&year=2000&order=bayesian',
+    ))
+    def test_07_ranking_is_read_by_index(self, client, catalog, query):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'{self.URL}?{query}')
+        sql = next(
+            captured['sql'] for captured in context.captured_queries
+            if 'reviews_titleranking' in captured['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        # Все фильтры — условия поиска по индексу, а не проверки строк
+        # при обходе, и порядок берётся из индекса без сортировки.
+        search = [step for step in plan if 'reviews_titleranking' in step]
+        columns = ['genre_id=?'] + [
+            column for param, column in (
+                ('category', 'category_id=?'), ('year', 'year=?')
+            )
+            if param in query
+        ]
+        assert len(search) == 1 and all(
+            column in search[0] for column in columns
+        ) and not any('TEMP B-TREE' in step for step in plan), (
+            f'Проверьте, что рейтинг для `?{query}` читается по индексу '
+            f'на {columns} без сортировки: {plan}'
+        )
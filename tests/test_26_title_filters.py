@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    films = Category.objects.create(name='Фильм', slug='films')
+    film_noir = Category.objects.create(name='Нуар', slug='film-noir')
+    books = Category.objects.create(name='Книга', slug='books')
+    rock = Genre.objects.create(name='Рок', slug='rock')
+    punk_rock = Genre.objects.create(name='Панк-рок', slug='punk-rock')
+    jazz = Genre.objects.create(name='Джаз', slug='jazz')
+    genres = {
+        ('Рок-фильм', 1980, films): [rock],
+        ('Панк', 1990, film_noir): [punk_rock],
+        ('Джаз и рок', 2000, books): [rock, jazz],
+        ('Тишина', 2010, books): [],
+    }
+    for (name, year, category), title_genres in genres.items():
+        Title.objects.create(
+            name=name, year=year, category=category
+        ).genre.set(title_genres)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleFilters:
+
+    URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.URL}?{query}')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET `{self.URL}?{query}` возвращает 200.'
+        )
+        return [item['name'] for item in response.json()['results']]
+
+    def test_01_exact_slugs(self, client, catalog):
+        assert self.get_names(client, 'genre=rock') == [
+            'Джаз и рок', 'Рок-фильм'
+        ], (
+            'Проверьте, что фильтр `genre` сравнивает слаг целиком и '
+            '`rock` не находит `punk-rock`.'
+        )
+        assert self.get_names(client, 'category=films') == ['Рок-фильм']
+
+    def test_02_multiple_slugs(self, client, catalog):
+        assert self.get_names(client, 'genre=rock,jazz') == [
+            'Джаз и рок', 'Рок-фильм'
+        ], (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'попадает в выдачу один раз.'
+        )
+        assert self.get_names(client, 'category=films,film-noir') == [
+            'Панк', 'Рок-фильм'
+        ]
+        assert len(self.get_names(client, 'genre=,')) == 4
+
+    def test_03_prefix_and_year_range(self, client, catalog):
+        assert self.get_names(client, 'category__startswith=film') == [
+            'Панк', 'Рок-фильм'
+        ]
+        assert self.get_names(client, 'genre__startswith=ro,ja') == [
+            'Джаз и рок', 'Рок-фильм'
+        ]
+        assert self.get_names(client, 'year__gte=1990&year__lte=2000') == [
+            'Джаз и рок', 'Панк'
+        ]
+        assert self.get_names(client, 'year=2010') == ['Тишина']
+        assert client.get(f'{self.URL}?year__gte=abc').status_code == 400
+
+    def test_04_filters_use_indexes(self, client, catalog):
+        for query in ('genre=rock,jazz', 'genre__startswith=ro',
+                      'category=films', 'category__startswith=film',
+                      'year__gte=1990&year__lte=2000'):
+            with CaptureQueriesContext(connection) as context:
+                client.get(f'{self.URL}?{query}')
+            for captured in context.captured_queries:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {captured["sql"]}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                scans = [
+                    step for step in plan
+                    if step.startswith('SCAN') and 'INDEX' not in step
+                ]
+                assert not scans, (
+                    f'Проверьте, что запросы для `?{query}` идут по '
+                    f'индексам, а не перебором таблиц: {scans}'
+                )
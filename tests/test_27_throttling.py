@@ -0,0 +1,84 @@
+import pytest
+
+from api.throttling import LRUBucketStore, get_bucket_store
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_username_limit(self, client, settings,
+                                      django_assert_num_queries):
+        settings.API_THROTTLE_RATES = {'signup_username': '2/hour'}
+        data = {'username': 'bot', 'email': 'bot@yamdb.fake'}
+        for _ in range(2):
+            assert client.post(self.URL_SIGNUP, data=data).status_code == 200
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что повторная регистрация сверх лимита на имя '
+            'пользователя отклоняется с кодом 429 без запросов к базе.'
+        )
+        assert int(response['Retry-After']) > 0
+        other = {'username': 'human', 'email': 'human@yamdb.fake'}
+        assert client.post(self.URL_SIGNUP, data=other).status_code == 200
+
+    def test_02_token_ip_limit(self, client, settings):
+        settings.API_THROTTLE_RATES = {'token_ip': '3/min'}
+        for idx in range(3):
+            response = client.post(
+                self.URL_TOKEN,
+                data={'username': f'user{idx}', 'confirmation_code': '0'},
+            )
+            assert response.status_code != 429
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': 'user9', 'confirmation_code': '0'},
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода подтверждения с одного адреса '
+            'ограничен.'
+        )
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': 'user9', 'confirmation_code': '0'},
+            REMOTE_ADDR='10.0.0.1',
+        )
+        assert response.status_code != 429
+
+    def test_03_forwarded_for_is_not_trusted(self, client, settings):
+        settings.API_THROTTLE_RATES = {'signup_ip': '1/hour'}
+        for idx in range(3):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={
+                    'username': f'bot{idx}', 'email': f'bot{idx}@yamdb.fake'
+                },
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{idx}',
+            )
+        assert response.status_code == 429, (
+            'Проверьте, что подделанный заголовок X-Forwarded-For не '
+            'обходит лимит на адрес клиента.'
+        )
+
+    def test_04_lru_store(self, client, settings):
+        store = LRUBucketStore()
+        assert store.take('key', 2, 1.0, 100.0) == 0
+        assert store.take('key', 2, 1.0, 100.0) == 0
+        assert store.take('key', 2, 1.0, 100.0) == 1.0
+        assert store.take('key', 2, 1.0, 100.5) == 0.5
+        assert store.take('key', 2, 1.0, 101.0) == 0, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+        store.max_size = 1
+        store.take('other', 2, 1.0, 101.0)
+        assert store.get('key') is None
+        settings.API_THROTTLE_STORE = 'api.throttling.LRUBucketStore'
+        settings.API_THROTTLE_RATES = {'signup_ip': '1/hour'}
+        get_bucket_store().clear()
+        data = {'username': 'bot', 'email': 'bot@yamdb.fake'}
+        assert client.post(self.URL_SIGNUP, data=data).status_code == 200
+        assert client.post(self.URL_SIGNUP, data=data).status_code == 429
+        get_bucket_store().clear()
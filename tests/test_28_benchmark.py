@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+from tests.conftest import MANAGE_PATH
+
+BASELINE = os.path.join(MANAGE_PATH, 'benchmarks', 'baseline.json')
+
+
+class Test28Benchmark:
+
+    def test_01_benchmark_matches_baseline(self, tmp_path):
+        output = tmp_path / 'run.json'
+        result = subprocess.run(
+            [
+                sys.executable, 'manage.py', 'benchmark',
+                '--requests', '3', '--users', '20', '--titles', '20',
+                '--output', str(output),
+            ],
+            cwd=MANAGE_PATH,
+            env=dict(os.environ, PYTHONPATH=MANAGE_PATH),
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, (
+            'Проверьте, что команда `benchmark` проходит все маршруты: '
+            f'{result.stderr[-2000:]}'
+        )
+        assert '"path"' not in result.stdout + result.stderr, (
+            'Проверьте, что журнал запросов не попадает в вывод бенчмарка.'
+        )
+        with open(output, encoding='utf-8') as file:
+            run = json.load(file)
+        with open(BASELINE, encoding='utf-8') as file:
+            baseline = json.load(file)
+        assert sorted(run) == sorted(baseline), (
+            'Проверьте, что benchmarks/baseline.json снят по всем маршрутам '
+            'бенчмарка.'
+        )
+        changed = {
+            route: (baseline[route]['queries'], row['queries'])
+            for route, row in run.items()
+            if row['queries'] != baseline[route]['queries']
+        }
+        assert not changed, (
+            'Число SQL-запросов разошлось с benchmarks/baseline.json, '
+            f'переснимите его: {changed}'
+        )